@@ -0,0 +1,290 @@
+"""
+Command Line Interface Module
+
+This module provides a lightweight command line front end with one
+subcommand per pipeline stage. Each subcommand imports only the modules
+its stage needs, so for example `transcript` never loads OpenCV or
+Tesseract and short-lived worker invocations start quickly.
+
+Usage:
+    python -m src.cli transcript [URL] [--lang en,es] [--all-kinds] [--output captions.json]
+    python -m src.cli ocr FRAMES_DIR [--lang eng] [--min-confidence 50] [--output frames.json]
+                      [--broker BROKER] [--embed-images] [--timeout SECONDS]
+                      [--preprocessing auto]
+    python -m src.cli ocr-worker BROKER [--idle-timeout SECONDS]
+    python -m src.cli analyze [--captions captions.json] [--frames frames.json]
+    python -m src.cli run [URL] [--bounded-memory]
+    python -m src.cli export results.jsonl OUTPUT_DIR
+    python -m src.cli index index.db results.jsonl
+    python -m src.cli search index.db "docker compose up" [--limit 20] [--source frame]
+"""
+
+import argparse
+import json
+import sys
+
+def _write_json(data, output_path):
+    """
+    Write stage results as JSON to a file or to stdout.
+
+    Args:
+        data: JSON-serializable results
+        output_path (str): Destination file, or None for stdout
+    """
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+
+def _read_json(input_path):
+    """
+    Read stage results previously written by _write_json.
+
+    Args:
+        input_path (str): Path to the JSON file
+
+    Returns:
+        The decoded results
+    """
+    with open(input_path, encoding='utf-8') as f:
+        return json.load(f)
+
+def _read_captions(input_path):
+    """
+    Read captions written by the transcript command.
+
+    Args:
+        input_path (str): Path to the JSON file
+
+    Returns:
+        list: Captions of the first track in the file
+    """
+    captions = _read_json(input_path)
+    if isinstance(captions, dict):
+        return next(iter(captions.values()), [])
+    return captions
+
+def _video_url(args):
+    """
+    Return the video URL given on the command line or the configured default.
+    """
+    if args.url:
+        return args.url
+    from src.config import VIDEO_URL
+    return VIDEO_URL
+
+def run_transcript(args):
+    """
+    Extract the transcripts of a video without touching video or OCR modules.
+
+    Output maps "<language>.<kind>" to the captions of each fetched track.
+    """
+    from src.transcript_processing import process_transcripts
+    video_url = _video_url(args)
+    languages = args.lang
+    if languages is None:
+        from src.config import TRANSCRIPT_LANGUAGES
+        languages = TRANSCRIPT_LANGUAGES
+    transcripts = process_transcripts(video_url, languages, all_kinds=args.all_kinds)
+    _write_json({f"{lang}.{kind}": captions for (lang, kind), captions in transcripts.items()},
+                args.output)
+
+def run_ocr(args):
+    """
+    Run OCR over a directory of previously extracted frames.
+    """
+    from src.ocr_processing import process_frames
+    if args.embed_images and not args.broker:
+        raise SystemExit("ocr: --embed-images requires --broker")
+    if args.timeout is not None and not args.broker:
+        raise SystemExit("ocr: --timeout requires --broker")
+    if args.min_confidence is not None and args.broker:
+        raise SystemExit("ocr: --min-confidence is not supported with --broker")
+    broker = None
+    if args.broker:
+        from src.ocr_queue import open_broker
+        broker = open_broker(args.broker)
+    frame_texts = process_frames(args.frames_dir, broker, args.lang, args.min_confidence,
+                                 args.preprocessing, args.embed_images, args.timeout)
+    _write_json(frame_texts, args.output)
+
+def run_ocr_worker(args):
+    """
+    Process OCR jobs from a shared queue until it stays empty.
+    """
+    from src.ocr_queue import open_broker, run_worker
+    with open_broker(args.broker) as broker:
+        completed = run_worker(broker, worker_id=args.worker_id,
+                               idle_timeout=args.idle_timeout)
+    print(f"✓ OCR worker finished: {completed} frames processed")
+
+def run_analyze(args):
+    """
+    Analyze previously extracted captions and/or frame text with Groq.
+    """
+    if not args.captions and not args.frames:
+        raise SystemExit("analyze: at least one of --captions or --frames is required")
+
+    from src.groq_integration import analyze_transcript, analyze_extracted_text
+    results = {}
+    if args.captions:
+        analysis = analyze_transcript(_read_captions(args.captions))
+        results['transcript_analysis'] = analysis.choices[0].message.content
+    if args.frames:
+        analysis = analyze_extracted_text(_read_json(args.frames))
+        results['frame_analysis'] = analysis.choices[0].message.content
+    _write_json(results, args.output)
+
+def run_pipeline(args):
+    """
+    Run the full pipeline as in src.main.
+    """
+    from src.main import main
+    main(args.url, bounded_memory=args.bounded_memory or None)
+
+def _language_list(value):
+    """
+    Parse a comma-separated list of language codes.
+    """
+    return [lang.strip() for lang in value.split(',') if lang.strip()]
+
+def run_export(args):
+    """
+    Export a JSONL results corpus to Parquet tables.
+    """
+    from src.results import iter_records, export_parquet
+    paths = export_parquet(iter_records(args.results), args.output_dir)
+    for name, path in paths.items():
+        print(f"✓ Exported {name} to {path}")
+
+def run_index(args):
+    """
+    Add every video of a JSONL results corpus to a search index.
+
+    The corpus is streamed one video at a time.
+    """
+    from src.results import iter_video_results
+    from src.search_index import SearchIndex
+    with SearchIndex(args.index) as index:
+        for result in iter_video_results(args.results):
+            segments = index.ingest_result(result)
+            print(f"✓ Indexed {result.video.video_id}: {segments} segments")
+
+def run_search(args):
+    """
+    Search the index and print the matching videos and time offsets.
+    """
+    from src.search_index import SearchIndex
+    with SearchIndex(args.index) as index:
+        try:
+            hits = index.search(args.query, limit=args.limit, phrase=not args.expression,
+                                source=args.source)
+        except ValueError as e:
+            raise SystemExit(f"search: {str(e)}")
+    for hit in hits:
+        minutes, seconds = divmod(int(hit['start'] or 0), 60)
+        hours, minutes = divmod(minutes, 60)
+        offset = f"{hours}:{minutes:02d}:{seconds:02d}"
+        print(f"{hit['video_id']}  {offset}  [{hit['source']}]  {hit['snippet']}")
+
+def build_parser():
+    """
+    Build the argument parser with one subcommand per stage.
+
+    Returns:
+        argparse.ArgumentParser: The configured parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Extract and analyze code from YouTube videos."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    transcript = subparsers.add_parser("transcript", help="Extract the video transcript only")
+    transcript.add_argument("url", nargs="?", help="Video URL (default: VIDEO_URL from config)")
+    transcript.add_argument("--lang", type=_language_list,
+                            help="Comma-separated subtitle languages in order of priority "
+                                 "(default: TRANSCRIPT_LANGUAGES from config)")
+    transcript.add_argument("--all-kinds", action="store_true",
+                            help="Fetch both manual and automatic tracks of each language")
+    transcript.add_argument("--output", "-o", help="Write captions JSON to this file")
+    transcript.set_defaults(func=run_transcript)
+
+    ocr = subparsers.add_parser("ocr", help="Run OCR on extracted frames only")
+    ocr.add_argument("frames_dir", help="Directory containing PNG frames")
+    ocr.add_argument("--lang", default="eng",
+                     help="Tesseract language code(s), e.g. spa+eng (default: eng)")
+    ocr.add_argument("--min-confidence", type=float,
+                     help="Use confidence-aware OCR and drop frames below this mean word confidence")
+    ocr.add_argument("--output", "-o", help="Write frame text JSON to this file")
+    ocr.add_argument("--broker",
+                     help="Publish frames to this OCR job queue for workers: a redis:// URL, "
+                          "or a SQLite database path for workers on this host")
+    ocr.add_argument("--embed-images", action="store_true",
+                     help="Ship frame images with the jobs, for workers without access "
+                          "to the frames directory")
+    ocr.add_argument("--timeout", type=float,
+                     help="Give up after waiting this many seconds for the workers "
+                          "(default: wait forever)")
+    ocr.add_argument("--preprocessing", default="auto",
+                     choices=["auto", "otsu", "dark_theme", "upscaled", "adaptive"],
+                     help="Image preprocessing before OCR; auto calibrates on a sample of "
+                          "the frames (default: auto)")
+    ocr.set_defaults(func=run_ocr)
+
+    worker = subparsers.add_parser("ocr-worker", help="Process OCR jobs from a shared queue")
+    worker.add_argument("broker",
+                        help="OCR job queue shared with the publisher: a redis:// URL, "
+                             "or a SQLite database path on this host")
+    worker.add_argument("--worker-id", help="Identifier of this worker (default: host name)")
+    worker.add_argument("--idle-timeout", type=float,
+                        help="Exit after this many seconds without jobs (default: run forever)")
+    worker.set_defaults(func=run_ocr_worker)
+
+    analyze = subparsers.add_parser("analyze", help="Analyze saved captions/frame text only")
+    analyze.add_argument("--captions", help="Captions JSON written by the transcript command")
+    analyze.add_argument("--frames", help="Frame text JSON written by the ocr command")
+    analyze.add_argument("--output", "-o", help="Write analysis JSON to this file")
+    analyze.set_defaults(func=run_analyze)
+
+    run = subparsers.add_parser("run", help="Run the full pipeline")
+    run.add_argument("url", nargs="?", help="Video URL (default: VIDEO_URL from config)")
+    run.add_argument("--bounded-memory", action="store_true",
+                     help="Stream stages through spill files to keep memory flat")
+    run.set_defaults(func=run_pipeline)
+
+    export = subparsers.add_parser("export", help="Export a JSONL results corpus to Parquet")
+    export.add_argument("results", help="JSONL results file (RESULTS_PATH)")
+    export.add_argument("output_dir", help="Directory for the Parquet tables")
+    export.set_defaults(func=run_export)
+
+    index = subparsers.add_parser("index", help="Add a JSONL results corpus to a search index")
+    index.add_argument("index", help="Search index database")
+    index.add_argument("results", help="JSONL results file (RESULTS_PATH)")
+    index.set_defaults(func=run_index)
+
+    search = subparsers.add_parser("search", help="Find videos and offsets where text appeared")
+    search.add_argument("index", help="Search index database")
+    search.add_argument("query", help="Text to look for (matched as a phrase)")
+    search.add_argument("--limit", type=int, default=20, help="Maximum number of hits")
+    search.add_argument("--source", choices=["frame", "caption"], help="Only search OCR text or captions")
+    search.add_argument("--expression", action="store_true",
+                        help="Treat the query as an FTS5 expression instead of a phrase")
+    search.set_defaults(func=run_search)
+
+    return parser
+
+def cli(argv=None):
+    """
+    Parse command line arguments and run the selected stage.
+
+    Args:
+        argv (list): Arguments to parse (default: sys.argv[1:])
+    """
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,398 @@
+"""
+Code Reconstruction Module
+
+This module rebuilds coherent code listings from per-frame OCR text.
+Consecutive frames of a coding video usually show the same file, either
+unchanged or scrolled by a few lines. Frames are fuzzily deduplicated by
+matching their lines against known blocks (exact hashes first, then string
+similarity to absorb OCR noise) and diffing the matched lines, overlapping
+views of a scrolling file are merged into a single listing, and the range
+of frames each block came from is tracked so the LLM receives each piece of
+code only once.
+"""
+
+import difflib
+import functools
+import hashlib
+import re
+
+# Minimum fraction of a frame's lines that must already appear in a block
+# for the frame to be treated as another view of that block
+MIN_OVERLAP = 0.5
+
+# Minimum fraction of matching lines, in both directions, for two frames to
+# show the same screen
+SAME_SCREEN_OVERLAP = 0.9
+
+# Minimum similarity for two OCR lines to be considered the same line
+LINE_SIMILARITY = 0.8
+
+# Lines shorter than this only match exactly; in short lines a single
+# character is as likely to be a real difference (x = 1, x = 2) as noise
+MIN_FUZZY_LENGTH = 12
+
+# Minimum share of character trigrams two lines need before their
+# similarity is computed
+MIN_TRIGRAM_OVERLAP = 0.5
+
+# Earlier blocks a frame is matched against when it does not continue the
+# current block, taken from those sharing the most identical lines with it
+MAX_CANDIDATE_BLOCKS = 8
+
+_WHITESPACE = re.compile(r"\s+")
+
+def _normalize_line(line):
+    """
+    Normalize a line of OCR text for comparison.
+
+    Args:
+        line (str): Raw line of OCR text
+
+    Returns:
+        str: Lowercased line with all whitespace runs collapsed
+    """
+    return _WHITESPACE.sub(" ", line).strip().lower()
+
+def _line_hash(line):
+    """
+    Hash a normalized line of OCR text.
+
+    Args:
+        line (str): Normalized line of text
+
+    Returns:
+        str: Short hex digest identifying the line
+    """
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=8).hexdigest()
+
+@functools.lru_cache(maxsize=4096)
+def _trigrams(line):
+    """
+    Return the set of character trigrams of a normalized line.
+    """
+    return frozenset(line[i:i + 3] for i in range(len(line) - 2))
+
+def _line_similarity(old, new):
+    """
+    Score how likely two normalized lines are OCR reads of the same line.
+
+    Args:
+        old (str): Normalized line of a block
+        new (str): Normalized line of a frame
+
+    Returns:
+        float: Similarity ratio, or 0.0 if it is below LINE_SIMILARITY or
+        either line is too short to be matched fuzzily
+    """
+    if len(old) < MIN_FUZZY_LENGTH or len(new) < MIN_FUZZY_LENGTH:
+        return 0.0
+    # Each OCR error breaks at most three trigrams, so reads of the same line
+    # keep most of them; this rejects unrelated lines before any diffing
+    old_grams, new_grams = _trigrams(old), _trigrams(new)
+    shared = len(old_grams & new_grams)
+    if 2 * shared < (len(old_grams) + len(new_grams)) * MIN_TRIGRAM_OVERLAP:
+        return 0.0
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    # Cheap upper bounds first; most line pairs are far apart
+    if matcher.real_quick_ratio() < LINE_SIMILARITY or matcher.quick_ratio() < LINE_SIMILARITY:
+        return 0.0
+    ratio = matcher.ratio()
+    return ratio if ratio >= LINE_SIMILARITY else 0.0
+
+def _align_similar(old, new):
+    """
+    Pair similar lines of two line runs without changing their order.
+
+    Picks the order-preserving pairing with the highest total similarity,
+    so a noisy line is paired with the block line at the matching position
+    rather than with a similar but distinct line elsewhere.
+
+    Args:
+        old (list): Normalized lines of a block
+        new (list): Normalized lines of a frame
+
+    Returns:
+        list: (old_index, new_index) pairs in increasing order
+    """
+    scores = [[_line_similarity(o, n) for n in new] for o in old]
+    # best[i][j]: highest total similarity pairing old[:i] with new[:j]
+    best = [[0.0] * (len(new) + 1) for _ in range(len(old) + 1)]
+    for i in range(1, len(old) + 1):
+        for j in range(1, len(new) + 1):
+            best[i][j] = max(best[i - 1][j], best[i][j - 1])
+            if scores[i - 1][j - 1]:
+                best[i][j] = max(best[i][j], best[i - 1][j - 1] + scores[i - 1][j - 1])
+
+    pairs = []
+    i, j = len(old), len(new)
+    while i and j:
+        if best[i][j] == best[i - 1][j]:
+            i -= 1
+        elif best[i][j] == best[i][j - 1]:
+            j -= 1
+        else:
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+    return pairs[::-1]
+
+class CodeBlock:
+    """
+    A reconstructed code listing and the frames it was assembled from.
+
+    Attributes:
+        lines (list): Raw lines of the reconstructed listing
+        keys (list): Hashes of the normalized lines, parallel to ``lines``
+        norms (list): Normalized lines, parallel to ``lines``
+        frames (list): Filenames of the frames merged into the block
+        index (int): Order in which the block was created
+    """
+
+    def __init__(self, frame, lines, keys, norms):
+        self.index = 0
+        self.lines = list(lines)
+        self.keys = list(keys)
+        self.norms = list(norms)
+        self.frames = [frame]
+
+    @property
+    def text(self):
+        """str: The reconstructed listing."""
+        return "\n".join(self.lines)
+
+    def match(self, keys, norms):
+        """
+        Match the lines of a frame against the lines of the block.
+
+        Lines with identical hashes are aligned first. The remaining lines
+        between those anchors are paired by similarity (see _align_similar),
+        so noisy reads such as ``def 1oad(path):`` still match
+        ``def load(path):``.
+
+        Args:
+            keys (list): Line hashes of the frame
+            norms (list): Normalized lines of the frame
+
+        Returns:
+            tuple: (overlap, matched_keys) where overlap is the fraction of
+            the frame's lines found in the block and matched_keys replaces
+            the hash of each fuzzily matched line with the hash of its block line
+        """
+        if not keys:
+            return 0.0, []
+
+        matched_keys = list(keys)
+        found = 0
+        matcher = difflib.SequenceMatcher(None, self.keys, keys, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                found += j2 - j1
+            elif tag == "replace":
+                for i, j in _align_similar(self.norms[i1:i2], norms[j1:j2]):
+                    matched_keys[j1 + j] = self.keys[i1 + i]
+                    found += 1
+        return found / len(keys), matched_keys
+
+    def merge(self, frame, lines, keys, norms):
+        """
+        Merge another view of the listing into the block.
+
+        Lines present in both views are kept once, lines that scrolled
+        into view are inserted at their position, and lines that differ
+        only by OCR noise keep the block's existing version.
+
+        Args:
+            frame (str): Filename of the frame being merged
+            lines (list): Raw lines of the frame
+            keys (list): Line hashes of the frame as returned by match
+            norms (list): Normalized lines of the frame
+        """
+        self.frames.append(frame)
+        if keys == self.keys:
+            return
+
+        matcher = difflib.SequenceMatcher(None, self.keys, keys, autojunk=False)
+        merged = []
+        block = list(zip(self.lines, self.keys, self.norms))
+        view = list(zip(lines, keys, norms))
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag in ("equal", "delete"):
+                merged.extend(block[i1:i2])
+            elif tag == "insert":
+                merged.extend(view[j1:j2])
+            else:
+                # Noisy reads were already matched to block lines by match,
+                # so replaced lines are genuinely different; keep both
+                merged.extend(block[i1:i2])
+                merged.extend(view[j1:j2])
+
+        self.lines = [line for line, _, _ in merged]
+        self.keys = [key for _, key, _ in merged]
+        self.norms = [norm for _, _, norm in merged]
+
+    def to_dict(self):
+        """
+        Convert the block to the dictionary format used by the pipeline.
+
+        Returns:
+            dict: Block information:
+                - start_frame (str): First frame the block appeared in
+                - end_frame (str): Last frame the block appeared in
+                - frames (list): All frames merged into the block
+                - text (str): Reconstructed listing
+        """
+        return {
+            'start_frame': self.frames[0],
+            'end_frame': self.frames[-1],
+            'frames': list(self.frames),
+            'text': self.text
+        }
+
+def _split_frame_text(text):
+    """
+    Split frame text into non-empty lines and their hashes.
+
+    Args:
+        text (str): OCR text of a single frame
+
+    Returns:
+        tuple: (lines, keys, norms) with the raw lines, the hashes of the
+        normalized lines and the normalized lines themselves
+    """
+    lines, keys, norms = [], [], []
+    for line in text.splitlines():
+        normalized = _normalize_line(line)
+        if normalized:
+            lines.append(line.rstrip())
+            keys.append(_line_hash(normalized))
+            norms.append(normalized)
+    return lines, keys, norms
+
+def is_same_screen(text, other_text, min_overlap=SAME_SCREEN_OVERLAP):
+    """
+    Tell whether two frame texts are OCR reads of the same screen.
+
+    Unlike merging into a block, this requires nearly all lines of each
+    text to match a line of the other, so scrolled views are not the same
+    screen while reads differing only by OCR noise are.
+
+    Args:
+        text (str): OCR text of one frame
+        other_text (str): OCR text of another frame
+        min_overlap (float): Fraction of each text's lines that must match
+
+    Returns:
+        bool: True if both texts show the same screen
+    """
+    if text == other_text:
+        return True
+    lines, keys, norms = _split_frame_text(text)
+    other_lines, other_keys, other_norms = _split_frame_text(other_text)
+    if not keys or not other_keys:
+        return not keys and not other_keys
+
+    overlap, _ = CodeBlock(None, lines, keys, norms).match(other_keys, other_norms)
+    matched = overlap * len(other_keys)
+    return overlap >= min_overlap and matched / len(keys) >= min_overlap
+
+def iter_code_blocks(frame_texts, min_overlap=MIN_OVERLAP, max_open_blocks=None):
+    """
+    Lazily deduplicate per-frame OCR text into reconstructed code blocks.
+
+    Blocks stay open while later frames may still be merged into them. When
+    ``max_open_blocks`` is set, the least recently seen block is closed and
+    yielded once that many are open, which bounds memory for long videos at
+    the cost of not merging a listing that reappears much later.
+
+    A frame is first matched against the most recently seen block. If it
+    does not continue that block, it is only matched against the
+    MAX_CANDIDATE_BLOCKS open blocks sharing the most identical lines with
+    it, found through an index from line hash to blocks, so the cost per
+    frame does not grow with the number of distinct screens.
+
+    Args:
+        frame_texts (iterable): Frame dictionaries as returned by
+            process_frames, each with 'frame' and 'text' keys, in frame order
+        min_overlap (float): Fraction of a frame's lines that must match an
+            existing block for the frame to be merged into it
+        max_open_blocks (int): Maximum number of blocks kept open, or None
+            to keep every block open until the input is exhausted
+
+    Yields:
+        dict: Block dictionaries (see CodeBlock.to_dict); blocks still open
+        at the end are yielded in the order they first appeared
+    """
+    # Open blocks, least recently seen first
+    blocks = []
+    # Line hash -> open blocks containing that line
+    blocks_by_key = {}
+    # Open block -> number of the frame it was last seen in
+    last_seen = {}
+    created = 0
+
+    for frame_number, frame_text in enumerate(frame_texts):
+        lines, keys, norms = _split_frame_text(frame_text['text'])
+        if not keys:
+            continue
+
+        # Most frames continue the block shown in the previous frame
+        best, best_overlap, best_keys = None, min_overlap, keys
+        if blocks:
+            overlap, matched_keys = blocks[-1].match(keys, norms)
+            if overlap >= best_overlap:
+                best, best_overlap, best_keys = blocks[-1], overlap, matched_keys
+
+        if best is None:
+            # Otherwise the video may have switched back to an earlier listing
+            shared = {}
+            for key in set(keys):
+                for block in blocks_by_key.get(key, ()):
+                    shared[block] = shared.get(block, 0) + 1
+            shared.pop(blocks[-1] if blocks else None, None)
+            candidates = sorted(shared, key=lambda b: (shared[b], last_seen[b]),
+                                reverse=True)[:MAX_CANDIDATE_BLOCKS]
+            for block in sorted(candidates, key=last_seen.get, reverse=True):
+                overlap, matched_keys = block.match(keys, norms)
+                if overlap >= best_overlap:
+                    best, best_overlap, best_keys = block, overlap, matched_keys
+
+        if best is not None:
+            best.merge(frame_text['frame'], lines, best_keys, norms)
+            blocks.remove(best)
+            blocks.append(best)
+        else:
+            best = CodeBlock(frame_text['frame'], lines, keys, norms)
+            best.index = created
+            created += 1
+            blocks.append(best)
+        last_seen[best] = frame_number
+        # Merging only ever adds lines to a block
+        for key in best.keys:
+            blocks_by_key.setdefault(key, set()).add(best)
+
+        if max_open_blocks is not None and len(blocks) > max_open_blocks:
+            closed = blocks.pop(0)
+            del last_seen[closed]
+            for key in set(closed.keys):
+                blocks_by_key[key].discard(closed)
+                if not blocks_by_key[key]:
+                    del blocks_by_key[key]
+            yield closed.to_dict()
+
+    for block in sorted(blocks, key=lambda b: b.index):
+        yield block.to_dict()
+
+def reconstruct_code_blocks(frame_texts, min_overlap=MIN_OVERLAP):
+    """
+    Deduplicate per-frame OCR text and reconstruct coherent code blocks.
+
+    Args:
+        frame_texts (list): Frame dictionaries as returned by process_frames,
+            each with 'frame' and 'text' keys, in frame order
+        min_overlap (float): Fraction of a frame's lines that must match an
+            existing block for the frame to be merged into it
+
+    Returns:
+        list: Block dictionaries (see CodeBlock.to_dict) ordered by the
+        first frame each block appeared in
+    """
+    return list(iter_code_blocks(frame_texts, min_overlap))
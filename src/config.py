@@ -3,17 +3,104 @@ Configuration Module
 
 This module contains all configuration variables and settings
 for the YouTube Video Code Extractor application.
+
+Settings are resolved on first access rather than at import time, so
+short-lived commands that never read a setting do not pay for loading
+the `.env` file.
 """
 
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+def _to_bool(value):
+    """
+    Interpret an environment variable value as a boolean flag.
+    """
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _to_list(value):
+    """
+    Interpret a comma-separated environment variable value as a list.
+    """
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def _to_optional_float(value):
+    """
+    Interpret an environment variable value as a float, or None if empty.
+    """
+    return float(value) if value.strip() else None
+
+# Setting name -> (environment variable default, converter)
+_SETTINGS = {
+    # Video processing settings
+    'VIDEO_URL': ('https://www.youtube.com/watch?v=your_default_video_id', str),
+    'FRAME_RATE': ('0.5', float),  # Extract one frame every 2 seconds by default
+
+    # Shared video metadata cache ('' = keep metadata in memory only)
+    'METADATA_CACHE_DIR': (os.path.join('.cache', 'video_info'), str),
+    'METADATA_CACHE_TTL': ('3600', float),  # Seconds; media URLs expire after a few hours
+
+    # Subtitle languages in order of priority; the first one found is analyzed
+    'TRANSCRIPT_LANGUAGES': ('en', _to_list),
+
+    # Bounded-memory mode: stream stages through on-disk spill files
+    'BOUNDED_MEMORY': ('false', _to_bool),
+    'SPILL_DIR': ('spill', str),
+
+    # Confidence-aware OCR: minimum mean word confidence (0-100) of kept frames ('' = off)
+    'OCR_MIN_CONFIDENCE': ('', _to_optional_float),
+
+    # OCR preprocessing pipeline: otsu, dark_theme, upscaled, adaptive, or auto
+    # to calibrate one per video on a sample of its frames
+    'OCR_PREPROCESSING': ('auto', str),
+
+    # Distributed OCR: redis:// URL of the job queue for workers on any machine,
+    # or a SQLite database path for workers on this host ('' = local OCR)
+    'OCR_BROKER': ('', str),
+    # Ship frame images with the jobs for workers without the frames directory
+    'OCR_EMBED_IMAGES': ('false', _to_bool),
+    # Seconds to wait for the workers to finish a video's frames ('' = forever)
+    'OCR_TIMEOUT': ('', _to_optional_float),
+
+    # JSONL corpus file that processed video results are appended to ('' = off)
+    'RESULTS_PATH': ('', str),
+
+    # Full-text search index that processed videos are added to ('' = off)
+    'SEARCH_INDEX': ('', str),
+
+    # Groq API settings
+    'GROQ_API_KEY': ('', str),
+}
+
+_env_loaded = False
+
+def _load_env():
+    """
+    Load environment variables from the `.env` file once per process.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def __getattr__(name):
+    """
+    Resolve a setting from the environment on first access.
+
+    Args:
+        name (str): Name of the setting
+
+    Returns:
+        The converted setting value
 
-# Video processing settings
-VIDEO_URL = os.getenv('VIDEO_URL', 'https://www.youtube.com/watch?v=your_default_video_id')
-FRAME_RATE = float(os.getenv('FRAME_RATE', '0.5'))  # Extract one frame every 2 seconds by default
+    Raises:
+        AttributeError: If the name is not a known setting
+    """
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Groq API settings
-GROQ_API_KEY = os.getenv('GROQ_API_KEY', '') 
\ No newline at end of file
+    _load_env()
+    default, convert = _SETTINGS[name]
+    value = convert(os.getenv(name, default))
+    globals()[name] = value
+    return value
@@ -7,8 +7,15 @@ and content understanding using Groq's language models.
 """
 
 import os
-from groq import Groq
 from src.config import GROQ_API_KEY
+from src.code_reconstruction import reconstruct_code_blocks, iter_code_blocks
+
+# Maximum characters of content per windowed analysis request, leaving room
+# for the prompt within process_content's length limit
+WINDOW_CHARS = 8000
+
+# Maximum reconstructed code blocks kept open during windowed analysis
+MAX_OPEN_BLOCKS = 32
 
 def process_content(text_content, model="llama-3.1-8b-instant"):
     """
@@ -32,6 +39,7 @@ def process_content(text_content, model="llama-3.1-8b-instant"):
         raise ValueError("Text content is too long")
     
     try:
+        from groq import Groq
         client = Groq(api_key=GROQ_API_KEY)
         completion = client.chat.completions.create(
             model=model,
@@ -54,6 +62,73 @@ def process_content(text_content, model="llama-3.1-8b-instant"):
     except Exception as e:
         raise Exception(f"Failed to process content with Groq: {str(e)}")
 
+def iter_text_windows(texts, max_chars=WINDOW_CHARS, separator="\n"):
+    """
+    Group a stream of text pieces into windows of bounded size.
+    
+    Pieces longer than a window are split across several windows; empty
+    pieces are skipped so no window is empty.
+    
+    Args:
+        texts (iterable): Text pieces in order, usually a generator
+        max_chars (int): Maximum characters per window
+        separator (str): String placed between pieces within a window
+        
+    Yields:
+        str: Consecutive windows of joined text
+    """
+    window, size = [], 0
+    for text in texts:
+        if not text:
+            continue
+        while len(text) > max_chars:
+            if window:
+                yield separator.join(window)
+                window, size = [], 0
+            yield text[:max_chars]
+            text = text[max_chars:]
+        
+        added = len(text) + (len(separator) if window else 0)
+        if window and size + added > max_chars:
+            yield separator.join(window)
+            window, size = [], 0
+            added = len(text)
+        window.append(text)
+        size += added
+    
+    if window:
+        yield separator.join(window)
+
+def _transcript_prompt(full_text):
+    """
+    Build the transcript analysis prompt.
+    """
+    return f"""Analyze the following video transcript and provide:
+1. Main topics discussed
+2. Key points or insights
+3. Summary of content
+
+Transcript:
+{full_text}"""
+
+def _extracted_text_prompt(text_content):
+    """
+    Build the frame text analysis prompt.
+    """
+    return f"""Analyze the following text extracted from video frames and provide:
+1. Identify any code snippets or technical content
+2. List tools, technologies, or concepts mentioned
+3. Extract any important commands or syntax
+
+Extracted Text:
+{text_content}"""
+
+def _format_block(block):
+    """
+    Format a reconstructed code block for an analysis prompt.
+    """
+    return f"Frames {block['start_frame']} - {block['end_frame']}:\n{block['text']}"
+
 def analyze_transcript(captions):
     """
     Analyze video transcript using Groq.
@@ -70,21 +145,15 @@ def analyze_transcript(captions):
     # Combine caption text
     full_text = "\n".join([c['text'] for c in captions])
     
-    # Create analysis prompt
-    prompt = f"""Analyze the following video transcript and provide:
-1. Main topics discussed
-2. Key points or insights
-3. Summary of content
-
-Transcript:
-{full_text}"""
-    
-    return process_content(prompt)
+    return process_content(_transcript_prompt(full_text))
 
 def analyze_extracted_text(frame_texts):
     """
     Analyze text extracted from video frames using Groq.
     
+    Frame text is deduplicated and merged into reconstructed code blocks
+    first, so repeated views of the same code are only sent once.
+    
     Args:
         frame_texts (list): List of dictionaries containing frame text data
         
@@ -94,19 +163,49 @@ def analyze_extracted_text(frame_texts):
     Raises:
         Exception: If analysis fails
     """
-    # Combine frame text
-    text_content = "\n".join([
-        f"Frame {f['frame']}: {f['text']}"
-        for f in frame_texts
-    ])
+    # Reconstruct code blocks from the per-frame text
+    blocks = reconstruct_code_blocks(frame_texts)
+    text_content = "\n\n".join([_format_block(b) for b in blocks])
     
-    # Create analysis prompt
-    prompt = f"""Analyze the following text extracted from video frames and provide:
-1. Identify any code snippets or technical content
-2. List tools, technologies, or concepts mentioned
-3. Extract any important commands or syntax
+    return process_content(_extracted_text_prompt(text_content))
 
-Extracted Text:
-{text_content}"""
+def analyze_transcript_windows(captions, max_chars=WINDOW_CHARS):
+    """
+    Analyze a transcript window by window without joining it in memory.
     
-    return process_content(prompt) 
\ No newline at end of file
+    Args:
+        captions (iterable): Caption dictionaries, e.g. read from a spill store
+        max_chars (int): Maximum transcript characters per request
+        
+    Yields:
+        dict: Analysis results from Groq, one per window
+        
+    Raises:
+        Exception: If analysis fails
+    """
+    texts = (c['text'] for c in captions)
+    for window in iter_text_windows(texts, max_chars):
+        yield process_content(_transcript_prompt(window))
+
+def analyze_extracted_text_windows(frame_texts, max_chars=WINDOW_CHARS):
+    """
+    Analyze frame text window by window without joining it in memory.
+    
+    Frames are streamed through code block reconstruction with a bounded
+    number of open blocks, and the resulting blocks are grouped into
+    windows of at most ``max_chars`` characters.
+    
+    Args:
+        frame_texts (iterable): Frame dictionaries, e.g. read from a spill store
+        max_chars (int): Maximum extracted text characters per request
+        
+    Yields:
+        dict: Analysis results from Groq, one per window
+        
+    Raises:
+        Exception: If analysis fails
+    """
+    blocks = iter_code_blocks(frame_texts, max_open_blocks=MAX_OPEN_BLOCKS)
+    texts = (_format_block(b) for b in blocks)
+    for window in iter_text_windows(texts, max_chars, separator="\n\n"):
+        yield process_content(_extracted_text_prompt(window)) 
\ No newline at end of file
@@ -4,56 +4,264 @@ Main Application Module
 This is the main entry point for the YouTube Video Code Extractor application.
 It orchestrates the video processing, transcript extraction, OCR, and content analysis
 using Groq's language models.
+
+Each stage imports its dependencies only when it runs, so yt-dlp, ffmpeg,
+OpenCV, Tesseract and the Groq SDK are not loaded before work begins.
 """
 
-from src.video_processing import process_video
-from src.transcript_processing import process_transcript
-from src.ocr_processing import process_frames
-from src.groq_integration import analyze_transcript, analyze_extracted_text
-from src.config import VIDEO_URL
+import itertools
+import os
+import shutil
+import tempfile
 
-def main():
+def main(video_url=None, bounded_memory=None):
     """
     Main function to process a YouTube video and extract/analyze its content.
     
     The function:
-    1. Downloads the video and extracts frames
-    2. Extracts and processes the video transcript
+    1. Resolves the video metadata once, downloads the video and extracts frames
+    2. Extracts and processes the video transcripts in the configured languages
     3. Performs OCR on extracted frames
     4. Analyzes content using Groq's language models
     
+    The results are returned as a typed VideoResult and, if RESULTS_PATH is
+    configured, appended to that JSONL corpus file. If SEARCH_INDEX is
+    configured, the video's OCR text and captions are added to that index.
+    
+    In bounded-memory mode each stage is streamed into a JSONL spill file
+    and the content is analyzed window by window, so peak memory stays flat
+    regardless of video length. Frame and caption records of every track are
+    then streamed straight to RESULTS_PATH and the returned result only holds
+    the per-window analyses.
+    
+    Args:
+        video_url (str): URL of the video to process (default: VIDEO_URL from config)
+        bounded_memory (bool): Stream stages through spill files
+            (default: BOUNDED_MEMORY from config)
+    
     Returns:
-        dict: Results containing transcript and frame analysis
+        VideoResult: Frame, caption and analysis records of the video
         
     Raises:
+        ValueError: If the OCR settings combine unsupported options
         Exception: If any processing step fails
     """
+    from src.config import TRANSCRIPT_LANGUAGES
+    _check_ocr_settings()
+    if video_url is None:
+        from src.config import VIDEO_URL
+        video_url = VIDEO_URL
+    if bounded_memory is None:
+        from src.config import BOUNDED_MEMORY
+        bounded_memory = BOUNDED_MEMORY
+    
+    if bounded_memory:
+        return _main_bounded(video_url, TRANSCRIPT_LANGUAGES)
+    
     try:
         print("Starting video processing...")
-        video_path, frames_dir = process_video(VIDEO_URL)
+        info = _video_info(video_url)
+        from src.video_processing import process_video
+        video_path, frames_dir = process_video(video_url, info)
         print("✓ Video processing complete")
         
         print("\nExtracting transcript...")
-        captions = process_transcript(VIDEO_URL)
-        print(f"✓ Transcript extraction complete: {len(captions)} captions")
+        from src.transcript_processing import process_transcripts
+        transcripts = process_transcripts(video_url, TRANSCRIPT_LANGUAGES, info=info)
+        captions = next(iter(transcripts.values()))
+        print(f"✓ Transcript extraction complete: {len(captions)} captions "
+              f"in {len(transcripts)} track(s)")
         
         print("\nProcessing frames with OCR...")
-        frame_texts = process_frames(frames_dir)
+        from src.ocr_processing import process_frames, tesseract_lang
+        from src.config import (OCR_MIN_CONFIDENCE, OCR_PREPROCESSING, OCR_EMBED_IMAGES,
+                                OCR_TIMEOUT)
+        ocr_lang = tesseract_lang([lang for lang, kind in transcripts])
+        frame_texts = process_frames(frames_dir, _ocr_broker(), ocr_lang, OCR_MIN_CONFIDENCE,
+                                     OCR_PREPROCESSING, OCR_EMBED_IMAGES, OCR_TIMEOUT)
         print(f"✓ OCR processing complete: {len(frame_texts)} frames with text")
         
         print("\nAnalyzing content with Groq...")
+        from src.groq_integration import analyze_transcript, analyze_extracted_text
         transcript_analysis = analyze_transcript(captions)
         frame_analysis = analyze_extracted_text(frame_texts)
         print("✓ Content analysis complete")
         
-        return {
-            'transcript_analysis': transcript_analysis,
-            'frame_analysis': frame_analysis
-        }
+        from src.config import FRAME_RATE, RESULTS_PATH
+        from src.results import VideoRecord, VideoResult, frame_records, analysis_record, write_jsonl
+        video = VideoRecord(info.get('id') or video_url, video_url, info.get('title'))
+        result = VideoResult(
+            video,
+            frames=list(frame_records(video.video_id, frame_texts, FRAME_RATE)),
+            captions=list(_track_records(video.video_id, transcripts)),
+            analyses=[
+                analysis_record(video.video_id, 'transcript', transcript_analysis),
+                analysis_record(video.video_id, 'frames', frame_analysis)
+            ]
+        )
+        if RESULTS_PATH:
+            write_jsonl([result], RESULTS_PATH)
+            print(f"✓ Results written to {RESULTS_PATH}")
+        
+        from src.config import SEARCH_INDEX
+        if SEARCH_INDEX:
+            from src.search_index import SearchIndex
+            with SearchIndex(SEARCH_INDEX) as index:
+                segments = index.ingest_result(result)
+            print(f"✓ Search index updated: {segments} segments")
+        
+        return result
+        
+    except Exception as e:
+        print(f"\n✗ Processing failed: {str(e)}")
+        raise e
+
+def _video_info(video_url):
+    """
+    Resolve the video metadata shared by the video and transcript stages.
+    
+    Args:
+        video_url (str): URL of the video to process
+        
+    Returns:
+        dict: yt-dlp info dict, from the metadata cache when still valid
+    """
+    from src.video_metadata import resolve_video_info
+    return resolve_video_info(video_url)
+
+def _track_records(video_id, tracks):
+    """
+    Stream the caption records of every transcript track of a video.
+    
+    Args:
+        video_id (str): Id of the video
+        tracks (dict): Mapping of (language, kind) to caption dictionaries
+            or a spill file of them
+        
+    Yields:
+        CaptionRecord: Caption rows, track by track
+    """
+    from src.results import caption_records
+    for (lang, kind), track in tracks.items():
+        yield from caption_records(video_id, track, lang, kind)
+
+def _check_ocr_settings():
+    """
+    Reject unsupported OCR settings before the video is downloaded.
+    
+    Raises:
+        ValueError: If confidence-aware OCR is combined with distributed OCR
+    """
+    from src.config import OCR_BROKER, OCR_MIN_CONFIDENCE
+    if OCR_BROKER and OCR_MIN_CONFIDENCE is not None:
+        raise ValueError("Confidence-aware OCR (OCR_MIN_CONFIDENCE) is not supported "
+                         "with distributed OCR (OCR_BROKER)")
+
+def _ocr_broker():
+    """
+    Open the distributed OCR job queue if one is configured.
+    
+    Returns:
+        RedisBroker or SQLiteBroker: Broker for OCR_BROKER, or None to run OCR locally
+    """
+    from src.config import OCR_BROKER
+    if not OCR_BROKER:
+        return None
+    from src.ocr_queue import open_broker
+    return open_broker(OCR_BROKER)
+
+def _main_bounded(video_url, languages):
+    """
+    Run the pipeline with every stage streamed through on-disk spill files.
+    
+    Each run spills into its own directory under SPILL_DIR, removed when the
+    run ends, so several workers can share SPILL_DIR.
+    
+    Args:
+        video_url (str): URL of the video to process
+        languages (list): Subtitle languages in order of priority
+        
+    Returns:
+        VideoResult: The video's per-window analysis records
+    """
+    from src.config import SPILL_DIR
+    from src.spill_store import JsonlSpool
+    
+    spill_dir = None
+    try:
+        print("Starting video processing...")
+        info = _video_info(video_url)
+        os.makedirs(SPILL_DIR, exist_ok=True)
+        spill_dir = tempfile.mkdtemp(prefix=f"{info.get('id') or 'video'}-", dir=SPILL_DIR)
+        from src.video_processing import process_video
+        video_path, frames_dir = process_video(video_url, info)
+        print("✓ Video processing complete")
+        
+        print("\nExtracting transcript...")
+        from src.transcript_processing import download_transcripts, iter_captions
+        transcript_paths = download_transcripts(video_url, languages, info=info)
+        tracks = {}
+        for number, (key, path) in enumerate(transcript_paths.items()):
+            tracks[key] = JsonlSpool(os.path.join(spill_dir, f"captions_{number}.jsonl"))
+            tracks[key].write(iter_captions(path))
+        captions = next(iter(tracks.values()))
+        print(f"✓ Transcript extraction complete: {len(captions)} captions "
+              f"in {len(tracks)} track(s)")
+        
+        print("\nProcessing frames with OCR...")
+        from src.ocr_processing import iter_frames, tesseract_lang
+        from src.config import (OCR_MIN_CONFIDENCE, OCR_PREPROCESSING, OCR_EMBED_IMAGES,
+                                OCR_TIMEOUT)
+        ocr_lang = tesseract_lang([lang for lang, kind in transcript_paths])
+        frame_texts = JsonlSpool(os.path.join(spill_dir, "frames.jsonl"))
+        frame_texts.write(iter_frames(frames_dir, _ocr_broker(), ocr_lang, OCR_MIN_CONFIDENCE,
+                                      OCR_PREPROCESSING, OCR_EMBED_IMAGES, OCR_TIMEOUT))
+        print(f"✓ OCR processing complete: {len(frame_texts)} frames with text")
+        
+        print("\nAnalyzing content with Groq...")
+        from src.groq_integration import analyze_transcript_windows, analyze_extracted_text_windows
+        from src.results import VideoRecord, VideoResult, frame_records, analysis_record, write_jsonl
+        video = VideoRecord(info.get('id') or video_url, video_url, info.get('title'))
+        analyses = [
+            analysis_record(video.video_id, 'transcript', completion, window)
+            for window, completion in enumerate(analyze_transcript_windows(captions))
+        ]
+        transcript_windows = len(analyses)
+        analyses.extend(
+            analysis_record(video.video_id, 'frames', completion, window)
+            for window, completion in enumerate(analyze_extracted_text_windows(frame_texts))
+        )
+        print(f"✓ Content analysis complete: {transcript_windows} transcript "
+              f"and {len(analyses) - transcript_windows} frame windows")
+        
+        from src.config import FRAME_RATE, RESULTS_PATH
+        if RESULTS_PATH:
+            write_jsonl(itertools.chain(
+                [video],
+                frame_records(video.video_id, frame_texts, FRAME_RATE),
+                _track_records(video.video_id, tracks),
+                analyses
+            ), RESULTS_PATH)
+            print(f"✓ Results written to {RESULTS_PATH}")
+        
+        from src.config import SEARCH_INDEX
+        if SEARCH_INDEX:
+            from src.search_index import SearchIndex
+            with SearchIndex(SEARCH_INDEX) as index:
+                segments = index.ingest_records(
+                    video, frame_records(video.video_id, frame_texts, FRAME_RATE),
+                    _track_records(video.video_id, tracks)
+                )
+            print(f"✓ Search index updated: {segments} segments")
+        
+        return VideoResult(video, analyses=analyses)
         
     except Exception as e:
         print(f"\n✗ Processing failed: {str(e)}")
         raise e
+    finally:
+        if spill_dir is not None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
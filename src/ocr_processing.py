@@ -4,18 +4,103 @@ OCR Processing Module
 This module handles the extraction of text from video frames using OCR (Optical Character Recognition).
 It uses OpenCV for image preprocessing and Tesseract for text extraction.
 The module provides functions for both individual image preprocessing and batch frame processing.
+Several preprocessing pipelines are available; calibrate_preprocessing picks the
+best one for a video from a small sample of its frames.
 """
 
 import pytesseract
 import cv2
+import functools
 import os
+import statistics
+import time
 
-def preprocess_image(image_path):
+# Words recognized with a lower Tesseract confidence (0-100) are dropped
+MIN_WORD_CONFIDENCE = 60
+
+# Frames whose mean word confidence is lower than this are dropped
+MIN_FRAME_CONFIDENCE = 50
+
+# Frames with fewer text-like regions than this are skipped before OCR
+MIN_TEXT_REGIONS = 2
+
+# Number of frames OCRed with every pipeline during calibration
+CALIBRATION_SAMPLE_SIZE = 6
+
+# Consecutive frames checked for text-like regions at each sample position
+CALIBRATION_PROBES = 10
+
+# Pipelines scoring within this fraction of the best one count as equally
+# good, and the fastest of them is chosen
+CALIBRATION_TOLERANCE = 0.05
+
+# Subtitle language codes (ISO 639-1, as used by YouTube) -> Tesseract language codes
+TESSERACT_LANGUAGES = {
+    'ar': 'ara', 'de': 'deu', 'en': 'eng', 'es': 'spa', 'fr': 'fra',
+    'hi': 'hin', 'id': 'ind', 'it': 'ita', 'ja': 'jpn', 'ko': 'kor',
+    'nl': 'nld', 'pl': 'pol', 'pt': 'por', 'ru': 'rus', 'sv': 'swe',
+    'tr': 'tur', 'uk': 'ukr', 'vi': 'vie', 'zh': 'chi_sim',
+    'zh-Hans': 'chi_sim', 'zh-Hant': 'chi_tra', 'zh-TW': 'chi_tra',
+}
+
+@functools.lru_cache(maxsize=None)
+def installed_languages():
+    """
+    List the language models of the local Tesseract installation.
+    
+    The result is cached for the lifetime of the process.
+    
+    Returns:
+        frozenset: Installed Tesseract language codes, or None if Tesseract
+        could not be queried
+    """
+    try:
+        return frozenset(pytesseract.get_languages(config=''))
+    except (pytesseract.TesseractError, OSError):
+        return None
+
+def tesseract_lang(languages, available=None):
+    """
+    Build a Tesseract language string matching a set of subtitle languages.
+    
+    English is always included, since code and commands are written in it.
+    Languages without a Tesseract model mapping are skipped, and so are
+    languages whose model is not installed (with a warning), since a single
+    missing model makes Tesseract fail on every frame.
+    
+    Args:
+        languages (list): Subtitle language codes, e.g. ['es', 'en-US']
+        available (set): Installed Tesseract language codes (default:
+            installed_languages(); no filtering if Tesseract can't be queried)
+        
+    Returns:
+        str: Tesseract language string, e.g. 'spa+eng'
+    """
+    if available is None:
+        available = installed_languages()
+    
+    codes = []
+    for lang in languages:
+        code = TESSERACT_LANGUAGES.get(lang) or TESSERACT_LANGUAGES.get(lang.split('-')[0])
+        if not code or code in codes:
+            continue
+        if available is not None and code not in available:
+            print(f"Warning: Tesseract language '{code}' for subtitles '{lang}' "
+                  f"is not installed, skipping it")
+            continue
+        codes.append(code)
+    if 'eng' not in codes:
+        codes.append('eng')
+    return '+'.join(codes)
+
+def preprocess_image(image_path, pipeline='otsu'):
     """
     Preprocess an image for better OCR accuracy.
     
     Args:
         image_path (str): Path to the input image file
+        pipeline (str): Name of the preprocessing pipeline, see
+            PREPROCESSING_PIPELINES (default: otsu)
         
     Returns:
         numpy.ndarray: Preprocessed image array optimized for OCR
@@ -23,53 +108,399 @@ def preprocess_image(image_path):
     Raises:
         FileNotFoundError: If the image file doesn't exist
         cv2.error: If the image cannot be processed
+        KeyError: If the pipeline is unknown
+    """
+    return PREPROCESSING_PIPELINES[pipeline](_read_grayscale(image_path))
+
+def _read_grayscale(image_path):
+    """
+    Read an image file as a grayscale array.
     """
     img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
     if img is None:
         raise FileNotFoundError(f"Could not read image: {image_path}")
-        
+    return img
+
+def _threshold(img):
+    """
+    Binarize a grayscale image for OCR.
+    """
     # Apply Otsu's thresholding for better text separation
-    _, img_thresh = cv2.threshold(img, 150, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    _, img_thresh = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
     return img_thresh
 
-def process_frames(frames_dir):
+def _dark_theme(img):
     """
-    Process all frames in a directory and extract text using OCR.
+    Binarize a frame so text ends up dark on a light background.
+    
+    Dark-mode editors produce light text on a dark background after
+    thresholding, which Tesseract reads poorly, so such frames are inverted.
+    """
+    img_thresh = _threshold(img)
+    if cv2.mean(img_thresh)[0] < 127:
+        img_thresh = cv2.bitwise_not(img_thresh)
+    return img_thresh
+
+def _upscaled(img):
+    """
+    Upscale a frame before binarizing, for small or anti-aliased fonts.
+    """
+    img = cv2.resize(img, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    return _dark_theme(img)
+
+def _adaptive(img):
+    """
+    Binarize with a local threshold, for uneven backgrounds and gradients.
+    """
+    return cv2.adaptiveThreshold(img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY, 31, 15)
+
+# Preprocessing pipeline name -> function from grayscale frame to OCR input
+PREPROCESSING_PIPELINES = {
+    'otsu': _threshold,
+    'dark_theme': _dark_theme,
+    'upscaled': _upscaled,
+    'adaptive': _adaptive,
+}
+
+def has_text_regions(img, min_regions=MIN_TEXT_REGIONS):
+    """
+    Cheaply check whether a frame contains text-like regions.
+    
+    Character edges are found with a morphological gradient and joined
+    horizontally into word/line shaped regions. Frames showing a webcam,
+    slides without text or heavy blur produce few such regions and can be
+    skipped before running Tesseract.
+    
+    Args:
+        img (numpy.ndarray): Grayscale frame
+        min_regions (int): Minimum number of text-like regions
+        
+    Returns:
+        bool: True if the frame is worth running OCR on
+    """
+    edge_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    join_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    
+    gradient = cv2.morphologyEx(img, cv2.MORPH_GRADIENT, edge_kernel)
+    _, edges = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    joined = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, join_kernel)
+    contours, _ = cv2.findContours(joined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    height = img.shape[0]
+    regions = 0
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # Text regions are wider than tall and within a plausible font size
+        if w > h and 6 <= h <= height // 3:
+            regions += 1
+            if regions >= min_regions:
+                return True
+    return False
+
+def extract_frame_text(frame_path, lang='eng', preprocessing='otsu'):
+    """
+    Extract text from a single frame using OCR.
+    
+    Args:
+        frame_path (str): Path to the frame image
+        lang (str): Tesseract language code(s) (default: eng)
+        preprocessing (str): Preprocessing pipeline name (default: otsu)
+        
+    Returns:
+        str: Extracted text with surrounding whitespace removed
+        
+    Raises:
+        FileNotFoundError: If the image file doesn't exist
+        Exception: If OCR processing fails
+    """
+    preprocessed_img = preprocess_image(frame_path, preprocessing)
+    text = pytesseract.image_to_string(preprocessed_img, lang=lang, config='--psm 6')
+    return text.strip()
+
+def _word_confidences(data):
+    """
+    List the confidences of the recognized words in image_to_data output.
+    """
+    return [
+        float(conf)
+        for word, conf in zip(data['text'], data['conf'])
+        if float(conf) >= 0 and word.strip()
+    ]
+
+def extract_frame_data(frame_path, lang='eng', min_word_confidence=MIN_WORD_CONFIDENCE,
+                       min_frame_confidence=MIN_FRAME_CONFIDENCE, preprocessing='otsu'):
+    """
+    Extract text, word boxes and confidences from a single frame.
+    
+    Frames without text-like regions are skipped before OCR. Words below
+    ``min_word_confidence`` are dropped from the text, and the whole frame
+    is dropped if the mean confidence of its words is below
+    ``min_frame_confidence``. Indentation is estimated from word positions
+    so code layout survives.
+    
+    Args:
+        frame_path (str): Path to the frame image
+        lang (str): Tesseract language code(s) (default: eng)
+        min_word_confidence (float): Minimum confidence (0-100) of kept words
+        min_frame_confidence (float): Minimum mean word confidence of kept frames
+        preprocessing (str): Preprocessing pipeline name (default: otsu)
+        
+    Returns:
+        dict: Frame data, or None if the frame was skipped or dropped:
+            - text (str): Text built from the kept words
+            - confidence (float): Mean confidence of all recognized words
+            - words (list): Kept words with 'text', 'conf', 'left', 'top',
+              'width' and 'height' keys, in preprocessed image coordinates
+            
+    Raises:
+        FileNotFoundError: If the image file doesn't exist
+        Exception: If OCR processing fails
+    """
+    img = _read_grayscale(frame_path)
+    if not has_text_regions(img):
+        return None
+    
+    data = pytesseract.image_to_data(PREPROCESSING_PIPELINES[preprocessing](img), lang=lang,
+                                     config='--psm 6', output_type=pytesseract.Output.DICT)
+    
+    confidences = _word_confidences(data)
+    lines = {}
+    for i, word in enumerate(data['text']):
+        conf = float(data['conf'][i])
+        if conf >= min_word_confidence and word.strip():
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append({
+                'text': word.strip(),
+                'conf': conf,
+                'left': data['left'][i],
+                'top': data['top'][i],
+                'width': data['width'][i],
+                'height': data['height'][i]
+            })
+    
+    if not confidences:
+        return None
+    confidence = statistics.mean(confidences)
+    if confidence < min_frame_confidence or not lines:
+        return None
+    
+    # Estimate indentation from the left edge of each line in character widths
+    words = [word for line in lines.values() for word in line]
+    char_width = statistics.median(w['width'] / len(w['text']) for w in words) or 1
+    margin = min(line[0]['left'] for line in lines.values())
+    text_lines = []
+    for line in lines.values():
+        indent = int(round((line[0]['left'] - margin) / char_width))
+        text_lines.append(" " * indent + " ".join(w['text'] for w in line))
+    
+    return {
+        'text': "\n".join(text_lines),
+        'confidence': round(confidence, 1),
+        'words': words
+    }
+
+def _sample_text_frames(frames_dir, sample_size):
+    """
+    Pick frames showing text at evenly spaced positions over a video.
+    
+    The video is split into ``sample_size`` equal stretches. From the start
+    of each stretch, up to CALIBRATION_PROBES consecutive frames are checked
+    and the first one with text-like regions is taken, so webcam or title
+    frames at a sample position do not shift the sample towards the start.
     
     Args:
         frames_dir (str): Directory containing the frame images (PNG format)
+        sample_size (int): Number of frames to sample
         
     Returns:
-        list: List of dictionaries containing frame information:
+        list: (frame_file, img) tuples with the grayscale frames, in frame order
+    """
+    frame_files = sorted(f for f in os.listdir(frames_dir) if f.endswith(".png"))
+    step = max(1, len(frame_files) // max(1, sample_size))
+    samples = []
+    for start in range(0, len(frame_files), step):
+        for frame_file in frame_files[start:start + min(step, CALIBRATION_PROBES)]:
+            img = _read_grayscale(os.path.join(frames_dir, frame_file))
+            if has_text_regions(img):
+                samples.append((frame_file, img))
+                break
+        if len(samples) >= sample_size:
+            break
+    return samples
+
+def calibrate_preprocessing(frames_dir, lang='eng', sample_size=CALIBRATION_SAMPLE_SIZE,
+                            pipelines=None):
+    """
+    Choose the preprocessing pipeline that works best for a video.
+    
+    Every pipeline is run on a small sample of frames spread evenly over the
+    whole video (see _sample_text_frames; frames without text-like regions
+    are passed over). Each pipeline is
+    scored by its yield of confidently recognized words per frame, weighted
+    by their mean confidence; among pipelines scoring within
+    CALIBRATION_TOLERANCE of the best, the fastest is chosen.
+    
+    Args:
+        frames_dir (str): Directory containing the frame images (PNG format)
+        lang (str): Tesseract language code(s) (default: eng)
+        sample_size (int): Number of frames to sample
+        pipelines (list): Pipeline names to try (default: all pipelines)
+        
+    Returns:
+        tuple: (pipeline, scores) where pipeline is the chosen name and
+        scores maps each tried name to a dictionary with 'score',
+        'confidence' (mean word confidence) and 'seconds' (OCR time per frame);
+        falls back to 'otsu' with empty scores when no frame has text
+        
+    Raises:
+        FileNotFoundError: If the frames directory doesn't exist
+    """
+    if not os.path.exists(frames_dir):
+        raise FileNotFoundError(f"Frames directory not found: {frames_dir}")
+    if pipelines is None:
+        pipelines = list(PREPROCESSING_PIPELINES)
+    
+    samples = [img for _, img in _sample_text_frames(frames_dir, sample_size)]
+    if not samples:
+        return 'otsu', {}
+    
+    scores = {}
+    for name in pipelines:
+        confidences = []
+        confident_words = 0
+        started = time.perf_counter()
+        for img in samples:
+            data = pytesseract.image_to_data(PREPROCESSING_PIPELINES[name](img), lang=lang,
+                                             config='--psm 6',
+                                             output_type=pytesseract.Output.DICT)
+            frame_confidences = _word_confidences(data)
+            confidences.extend(frame_confidences)
+            confident_words += sum(1 for c in frame_confidences if c >= MIN_WORD_CONFIDENCE)
+        seconds = (time.perf_counter() - started) / len(samples)
+        
+        confidence = statistics.mean(confidences) if confidences else 0.0
+        scores[name] = {
+            'score': confident_words / len(samples) * confidence / 100,
+            'confidence': confidence,
+            'seconds': seconds
+        }
+    
+    best_score = max(s['score'] for s in scores.values())
+    candidates = [
+        name for name in pipelines
+        if scores[name]['score'] >= best_score * (1 - CALIBRATION_TOLERANCE)
+    ]
+    pipeline = min(candidates, key=lambda name: scores[name]['seconds'])
+    return pipeline, scores
+
+def iter_frames(frames_dir, broker=None, lang='eng', min_confidence=None, preprocessing='otsu',
+                embed_images=False, timeout=None):
+    """
+    Lazily extract text from all frames in a directory, one frame at a time.
+    
+    Only the current frame is held in memory, so the caller can stream
+    results to disk for arbitrarily long videos. When a broker is given,
+    the frames are published as jobs for OCR workers (see ocr_queue) and
+    the results are yielded in frame order as they arrive.
+    
+    Args:
+        frames_dir (str): Directory containing the frame images (PNG format)
+        broker (SQLiteBroker or RedisBroker): Optional job queue shared with OCR workers
+        lang (str): Tesseract language code(s) (default: eng)
+        min_confidence (float): Enable confidence-aware OCR (see
+            extract_frame_data), dropping frames whose mean word confidence
+            is below this value; plain OCR is used when None
+        preprocessing (str): Preprocessing pipeline name, or 'auto' to pick
+            one with calibrate_preprocessing before processing (default: otsu)
+        embed_images (bool): Ship image bytes with broker jobs, for workers
+            without access to the frames directory
+        timeout (float): Seconds to wait for the broker's workers to finish
+            all frames, or None to wait forever
+        
+    Yields:
+        dict: Frame information for each frame that contains text:
             - frame (str): Frame filename
             - text (str): Extracted text from the frame
+            - confidence (float): Mean word confidence (confidence-aware OCR only)
+            - words (list): Kept word boxes (confidence-aware OCR only)
             
     Raises:
         FileNotFoundError: If the frames directory doesn't exist
-        Exception: If OCR processing fails
+        ValueError: If confidence-aware OCR is combined with a broker
+        TimeoutError: If the broker's workers do not finish within the timeout
     """
+    if broker is not None and min_confidence is not None:
+        raise ValueError("Confidence-aware OCR is not supported with a broker")
+    
+    if preprocessing == 'auto':
+        try:
+            preprocessing, _ = calibrate_preprocessing(frames_dir, lang)
+        except (pytesseract.TesseractError, OSError) as e:
+            # Calibrating needs local OCR, which a broker publisher may lack
+            print(f"Error calibrating preprocessing: {str(e)}")
+            preprocessing = 'otsu'
+        print(f"Using '{preprocessing}' preprocessing for {frames_dir}")
+    
+    if broker is not None:
+        from src.ocr_queue import iter_frames_distributed
+        yield from iter_frames_distributed(frames_dir, broker, embed_images, timeout, lang,
+                                           preprocessing)
+        return
+    
     if not os.path.exists(frames_dir):
         raise FileNotFoundError(f"Frames directory not found: {frames_dir}")
-        
-    extracted_data = []
     
     # Process each PNG frame in sorted order
     for frame_file in sorted(os.listdir(frames_dir)):
         if frame_file.endswith(".png"):
             frame_path = os.path.join(frames_dir, frame_file)
             try:
-                # Preprocess the image and extract text
-                preprocessed_img = preprocess_image(frame_path)
-                text = pytesseract.image_to_string(preprocessed_img, lang='eng', config='--psm 6')
-                
-                # Only add frames that contain text
-                if text.strip():
-                    extracted_data.append({
-                        'frame': frame_file,
-                        'text': text.strip()
-                    })
+                if min_confidence is not None:
+                    frame_data = extract_frame_data(frame_path, lang,
+                                                    min_frame_confidence=min_confidence,
+                                                    preprocessing=preprocessing)
+                else:
+                    text = extract_frame_text(frame_path, lang, preprocessing)
+                    frame_data = {'text': text} if text else None
             except Exception as e:
                 print(f"Error processing frame {frame_file}: {str(e)}")
                 continue
-                
-    return extracted_data 
\ No newline at end of file
+            
+            # Only yield frames that contain text
+            if frame_data is not None:
+                yield dict(frame=frame_file, **frame_data)
+
+def process_frames(frames_dir, broker=None, lang='eng', min_confidence=None,
+                   preprocessing='otsu', embed_images=False, timeout=None):
+    """
+    Process all frames in a directory and extract text using OCR.
+    
+    Args:
+        frames_dir (str): Directory containing the frame images (PNG format)
+        broker (SQLiteBroker or RedisBroker): Optional job queue shared with
+            OCR workers on other processes or machines; OCR runs locally when omitted
+        lang (str): Tesseract language code(s), see tesseract_lang (default: eng)
+        min_confidence (float): Enable confidence-aware OCR, dropping noisy
+            frames whose mean word confidence is below this value
+        preprocessing (str): Preprocessing pipeline name, or 'auto' to
+            calibrate on a sample of the frames first (default: otsu)
+        embed_images (bool): Ship image bytes with broker jobs, for workers
+            without access to the frames directory
+        timeout (float): Seconds to wait for the broker's workers to finish
+            all frames, or None to wait forever
+        
+    Returns:
+        list: List of dictionaries containing frame information:
+            - frame (str): Frame filename
+            - text (str): Extracted text from the frame
+            - confidence (float): Mean word confidence (confidence-aware OCR only)
+            - words (list): Kept word boxes (confidence-aware OCR only)
+            
+    Raises:
+        FileNotFoundError: If the frames directory doesn't exist
+        TimeoutError: If the broker's workers do not finish within the timeout
+        Exception: If OCR processing fails
+    """
+    return list(iter_frames(frames_dir, broker, lang, min_confidence, preprocessing,
+                            embed_images, timeout))
@@ -0,0 +1,750 @@
+"""
+OCR Queue Module
+
+This module distributes frame OCR across processes and machines through a
+job queue. Frame jobs (a frame name, OCR language and preprocessing
+pipeline plus either a path on shared storage or the image bytes) are
+published to a broker, worker processes claim and process them, and the
+publisher collects the results in frame order.
+
+Two brokers share the same interface:
+- RedisBroker keeps the queue in a Redis server, so workers on any node of
+  a fleet can take part (requires the optional redis package)
+- SQLiteBroker keeps the queue in a local SQLite database, for workers on
+  the same host and for testing; it must not be placed on a network
+  filesystem
+
+Claimed jobs hold a lease; if a worker dies or stalls, the lease expires
+and the job is handed to another worker, up to a maximum number of
+attempts. Expired leases are released both by claiming workers and by the
+publisher while it waits, so a job whose last worker died is still retried
+or failed. Jobs are keyed by frame name, language, preprocessing pipeline
+and image content, so publishing the same frames again reuses existing
+jobs instead of repeating the OCR. Embedded images are dropped as soon as a
+job is done, and finished jobs are removed RESULT_TTL seconds after they
+were last finished or reused, so the queue only keeps recent results.
+"""
+
+import hashlib
+import itertools
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+import uuid
+
+# Seconds a worker may hold a job before it is handed to another worker
+LEASE_SECONDS = 120
+
+# Attempts per job before it is marked as failed
+MAX_ATTEMPTS = 3
+
+# Frames read and hashed before their jobs are written to the broker
+PUBLISH_BATCH = 256
+
+# Seconds a finished job is kept for de-duplication after it was last used
+RESULT_TTL = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT UNIQUE NOT NULL,
+    frame TEXT NOT NULL,
+    frame_path TEXT,
+    image BLOB,
+    lang TEXT NOT NULL DEFAULT 'eng',
+    preprocessing TEXT NOT NULL DEFAULT 'otsu',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    text TEXT,
+    error TEXT,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq);
+"""
+
+# Version of the jobs table layout, stored in PRAGMA user_version
+SCHEMA_VERSION = 3
+
+# Columns added after the first release of the queue, for existing databases
+_ADDED_COLUMNS = [
+    ('lang', "TEXT NOT NULL DEFAULT 'eng'"),
+    ('preprocessing', "TEXT NOT NULL DEFAULT 'otsu'"),
+    ('finished_at', "REAL"),
+]
+
+def _job_batches(frames, lang, preprocessing):
+    """
+    Read and hash frames into job rows, in batches of PUBLISH_BATCH.
+
+    Args:
+        frames (iterable): (frame, frame_path, image) tuples
+        lang (str): Tesseract language code(s) for the OCR
+        preprocessing (str): Preprocessing pipeline name for the OCR
+
+    Yields:
+        list: (job_id, frame, frame_path, image) tuples
+    """
+    frames = iter(frames)
+    while True:
+        batch = []
+        for frame, frame_path, image in itertools.islice(frames, PUBLISH_BATCH):
+            digest = hashlib.sha256(f"{lang}:{preprocessing}:{frame}".encode("utf-8"))
+            if image is not None:
+                digest.update(image)
+            else:
+                with open(frame_path, "rb") as f:
+                    digest.update(f.read())
+            batch.append((digest.hexdigest(), frame, frame_path, image))
+        if not batch:
+            return
+        yield batch
+
+class _Broker:
+    """
+    Behaviour shared by the brokers: context management and ordered
+    collection of results.
+    """
+
+    def close(self):
+        """
+        Release the connection to the broker.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def iter_results(self, job_ids, timeout=None, poll_interval=0.5):
+        """
+        Wait for jobs to finish and yield their results in the given order.
+
+        Args:
+            job_ids (list): Job ids as returned by publish
+            timeout (float): Seconds to wait in total, or None to wait forever
+            poll_interval (float): Seconds between checks for finished jobs
+
+        Yields:
+            Row with frame, status ('done' or 'failed'), text and error
+
+        Raises:
+            TimeoutError: If the jobs do not finish within the timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for job_id in job_ids:
+            while True:
+                row = self.result(job_id)
+                if row['status'] in ('done', 'failed'):
+                    yield row
+                    break
+                if deadline is not None and time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for OCR of frame {row['frame']}")
+                # Without live workers nobody else releases abandoned jobs
+                if row['status'] == 'running' and self.expire_leases():
+                    continue
+                time.sleep(poll_interval)
+
+class SQLiteBroker(_Broker):
+    """
+    SQLite-backed queue of frame OCR jobs for workers on a single host.
+
+    Each process (publisher or worker) opens its own broker on the same
+    database file. The database uses write-ahead logging, which SQLite does
+    not support on network filesystems; use RedisBroker for workers on
+    other machines.
+
+    Attributes:
+        path (str): Location of the SQLite database
+        lease_seconds (float): How long a claimed job is reserved for a worker
+        max_attempts (int): Attempts per job before it is marked as failed
+        result_ttl (float): Seconds a finished job is kept after it was last used
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS,
+                 result_ttl=RESULT_TTL):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """
+        Bring a queue database created by an older version up to date.
+        """
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, definition in _ADDED_COLUMNS:
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            # Older versions kept images of finished jobs and never removed them
+            self._conn.execute("UPDATE jobs SET image = NULL WHERE status = 'done'")
+            self._conn.execute(
+                "UPDATE jobs SET finished_at = ? "
+                "WHERE status IN ('done', 'failed') AND finished_at IS NULL",
+                (time.time(),)
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self._conn.close()
+
+    def purge(self):
+        """
+        Remove finished jobs that have not been used for result_ttl seconds.
+
+        Returns:
+            int: Number of removed jobs
+        """
+        return self._conn.execute(
+            "DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.result_ttl,)
+        ).rowcount
+
+    def publish(self, frames, lang='eng', preprocessing='otsu'):
+        """
+        Publish frame jobs, reusing any job already published for the same
+        frame name, language, preprocessing pipeline and image content.
+
+        Frames are read and hashed outside of any transaction and written
+        in batches, so workers keep claiming jobs while a long video is
+        being published. Expired finished jobs are purged first.
+
+        Args:
+            frames (iterable): (frame, frame_path, image) tuples, where
+                frame_path is a path readable by all workers and image is the
+                raw image bytes (or None when workers read frame_path)
+            lang (str): Tesseract language code(s) for the OCR
+            preprocessing (str): Preprocessing pipeline name for the OCR
+
+        Returns:
+            list: Job ids in the order the frames were given
+        """
+        self.purge()
+        job_ids = []
+        for batch in _job_batches(frames, lang, preprocessing):
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Finished jobs are reused and kept for another result_ttl;
+                # failed ones get a fresh set of attempts
+                self._conn.executemany(
+                    "INSERT INTO jobs (job_id, frame, frame_path, image, lang, preprocessing) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (job_id) DO UPDATE SET "
+                    "status = CASE WHEN status = 'failed' THEN 'pending' ELSE status END, "
+                    "attempts = CASE WHEN status = 'failed' THEN 0 ELSE attempts END, "
+                    "finished_at = CASE WHEN status = 'done' THEN ? END "
+                    "WHERE status IN ('done', 'failed')",
+                    [job + (lang, preprocessing, now) for job in batch]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            job_ids.extend(job[0] for job in batch)
+        return job_ids
+
+    def _expire_leases(self, now):
+        """
+        Requeue jobs whose lease has expired, or fail them if they have no
+        attempts left.
+
+        Returns:
+            int: Number of released jobs
+        """
+        return self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'pending' END, finished_at = CASE WHEN attempts >= ? THEN ? END, "
+            "error = 'lease expired', worker = NULL "
+            "WHERE status = 'running' AND lease_expires < ?",
+            (self.max_attempts, self.max_attempts, now, now)
+        ).rowcount
+
+    def expire_leases(self):
+        """
+        Release jobs whose worker stopped responding.
+
+        Returns:
+            int: Number of jobs requeued or failed
+        """
+        return self._expire_leases(time.time())
+
+    def claim(self, worker_id):
+        """
+        Claim the oldest pending job, first releasing jobs with expired leases.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker
+
+        Returns:
+            sqlite3.Row: The claimed job, or None if no job is available
+        """
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._expire_leases(now)
+            job = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if job is not None:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                    "worker = ?, lease_expires = ? WHERE seq = ?",
+                    (worker_id, now + self.lease_seconds, job['seq'])
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return job
+
+    def complete(self, job_id, worker_id, text):
+        """
+        Record the OCR result of a claimed job and drop its embedded image.
+
+        Results from a worker whose lease was already taken over are ignored.
+
+        Args:
+            job_id (str): Id of the completed job
+            worker_id (str): Identifier of the worker holding the job
+            text (str): Extracted text
+
+        Returns:
+            bool: True if the result was recorded
+        """
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = 'done', text = ?, error = NULL, image = NULL, "
+            "finished_at = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+            (text, time.time(), job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Record a failed attempt, requeueing the job if attempts remain.
+
+        Args:
+            job_id (str): Id of the failed job
+            worker_id (str): Identifier of the worker holding the job
+            error (str): Description of the failure
+        """
+        self._conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' "
+            "ELSE 'pending' END, finished_at = CASE WHEN attempts >= ? THEN ? END, "
+            "error = ?, worker = NULL WHERE job_id = ? AND worker = ? AND status = 'running'",
+            (self.max_attempts, self.max_attempts, time.time(), error, job_id, worker_id)
+        )
+
+    def result(self, job_id):
+        """
+        Look up the state of a job.
+
+        Args:
+            job_id (str): Id of the job
+
+        Returns:
+            sqlite3.Row: Row with frame, status, text and error columns
+        """
+        return self._conn.execute(
+            "SELECT frame, status, text, error FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+
+# Lua scripts keep each Redis broker operation atomic, like the SQLite
+# transactions. Keys: job hash prefix, pending list, running lease set.
+# Finished job hashes expire after the result TTL.
+_REDIS_PUBLISH = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then
+    redis.call('HSET', KEYS[1], 'frame', ARGV[2], 'lang', ARGV[3],
+               'preprocessing', ARGV[4], 'status', 'pending', 'attempts', 0)
+    if ARGV[5] ~= '' then redis.call('HSET', KEYS[1], 'frame_path', ARGV[5]) end
+    if ARGV[6] == '1' then redis.call('HSET', KEYS[1], 'image', ARGV[7]) end
+elseif status == 'failed' then
+    redis.call('PERSIST', KEYS[1])
+    redis.call('HSET', KEYS[1], 'status', 'pending', 'attempts', 0)
+else
+    if status == 'done' then redis.call('EXPIRE', KEYS[1], ARGV[8]) end
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Shared by the claim and expire scripts; expects locals now, max_attempts and ttl
+_REDIS_RELEASE_EXPIRED = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)
+for _, job_id in ipairs(expired) do
+    local key = KEYS[1] .. job_id
+    redis.call('ZREM', KEYS[3], job_id)
+    redis.call('HDEL', key, 'worker')
+    redis.call('HSET', key, 'error', 'lease expired')
+    if tonumber(redis.call('HGET', key, 'attempts')) >= max_attempts then
+        redis.call('HSET', key, 'status', 'failed')
+        redis.call('EXPIRE', key, ttl)
+    else
+        redis.call('HSET', key, 'status', 'pending')
+        redis.call('LPUSH', KEYS[2], job_id)
+    end
+end
+"""
+
+_REDIS_EXPIRE = """
+local now, max_attempts, ttl = ARGV[1], tonumber(ARGV[2]), ARGV[3]
+""" + _REDIS_RELEASE_EXPIRED + """
+return #expired
+"""
+
+_REDIS_CLAIM = """
+local now, max_attempts, ttl = ARGV[2], tonumber(ARGV[4]), ARGV[5]
+""" + _REDIS_RELEASE_EXPIRED + """
+while true do
+    local job_id = redis.call('LPOP', KEYS[2])
+    if not job_id then return nil end
+    local key = KEYS[1] .. job_id
+    if redis.call('HGET', key, 'status') == 'pending' then
+        redis.call('HSET', key, 'status', 'running', 'worker', ARGV[1])
+        redis.call('HINCRBY', key, 'attempts', 1)
+        redis.call('ZADD', KEYS[3], tonumber(ARGV[2]) + tonumber(ARGV[3]), job_id)
+        return job_id
+    end
+end
+"""
+
+_REDIS_COMPLETE = """
+local key = KEYS[1] .. ARGV[1]
+local status = redis.call('HGET', key, 'status')
+if status ~= 'running' or redis.call('HGET', key, 'worker') ~= ARGV[2] then
+    return 0
+end
+redis.call('HSET', key, 'status', 'done', 'text', ARGV[3])
+redis.call('HDEL', key, 'error', 'image')
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('EXPIRE', key, ARGV[4])
+return 1
+"""
+
+_REDIS_FAIL = """
+local key = KEYS[1] .. ARGV[1]
+local status = redis.call('HGET', key, 'status')
+if status ~= 'running' or redis.call('HGET', key, 'worker') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('HDEL', key, 'worker')
+redis.call('HSET', key, 'error', ARGV[3])
+if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(ARGV[4]) then
+    redis.call('HSET', key, 'status', 'failed')
+    redis.call('EXPIRE', key, ARGV[5])
+else
+    redis.call('HSET', key, 'status', 'pending')
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+return 1
+"""
+
+class RedisBroker(_Broker):
+    """
+    Redis-backed queue of frame OCR jobs for workers across machines.
+
+    Jobs are Redis hashes, pending jobs wait in a list and claimed jobs sit
+    in a sorted set ordered by lease expiry. Finished job hashes expire
+    after result_ttl seconds. Requires the optional redis package.
+
+    Attributes:
+        url (str): Redis connection URL, e.g. redis://queue-host:6379/0
+        namespace (str): Prefix of all keys used by the queue
+        lease_seconds (float): How long a claimed job is reserved for a worker
+        max_attempts (int): Attempts per job before it is marked as failed
+        result_ttl (int): Seconds a finished job is kept after it was last used
+    """
+
+    def __init__(self, url, namespace="ocr", lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, client=None, result_ttl=RESULT_TTL):
+        """
+        Connect to the Redis server.
+
+        Args:
+            url (str): Redis connection URL
+            namespace (str): Prefix of all keys used by the queue
+            lease_seconds (float): How long a claimed job is reserved for a worker
+            max_attempts (int): Attempts per job before it is marked as failed
+            client: Existing redis.Redis client to use instead of connecting to url
+            result_ttl (int): Seconds a finished job is kept after it was last used
+
+        Raises:
+            ImportError: If redis is not installed and no client is given
+        """
+        self.url = url
+        self.namespace = namespace
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl = int(result_ttl)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("The Redis OCR broker requires redis: pip install redis")
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._keys = [f"{namespace}:job:", f"{namespace}:pending", f"{namespace}:running"]
+        self._publish = client.register_script(_REDIS_PUBLISH)
+        self._claim = client.register_script(_REDIS_CLAIM)
+        self._expire = client.register_script(_REDIS_EXPIRE)
+        self._complete = client.register_script(_REDIS_COMPLETE)
+        self._fail = client.register_script(_REDIS_FAIL)
+
+    def close(self):
+        """
+        Close the connection to the Redis server.
+        """
+        self._client.close()
+
+    def _job(self, job_id, *fields):
+        """
+        Read fields of a job hash, decoding everything except the image.
+        """
+        values = self._client.hmget(self._keys[0] + job_id, fields)
+        return {
+            field: value.decode("utf-8") if value is not None and field != 'image' else value
+            for field, value in zip(fields, values)
+        }
+
+    def publish(self, frames, lang='eng', preprocessing='otsu'):
+        """
+        Publish frame jobs, reusing any job already published for the same
+        frame name, language, preprocessing pipeline and image content.
+
+        Args:
+            frames (iterable): (frame, frame_path, image) tuples, where
+                frame_path is a path readable by all workers and image is the
+                raw image bytes (or None when workers read frame_path)
+            lang (str): Tesseract language code(s) for the OCR
+            preprocessing (str): Preprocessing pipeline name for the OCR
+
+        Returns:
+            list: Job ids in the order the frames were given
+        """
+        job_ids = []
+        for batch in _job_batches(frames, lang, preprocessing):
+            pipe = self._client.pipeline(transaction=False)
+            for job_id, frame, frame_path, image in batch:
+                self._publish(
+                    keys=[self._keys[0] + job_id, self._keys[1]],
+                    args=[job_id, frame, lang, preprocessing, frame_path or "",
+                          "0" if image is None else "1", image or b"", self.result_ttl],
+                    client=pipe
+                )
+            pipe.execute()
+            job_ids.extend(job[0] for job in batch)
+        return job_ids
+
+    def expire_leases(self):
+        """
+        Release jobs whose worker stopped responding.
+
+        Returns:
+            int: Number of jobs requeued or failed
+        """
+        return self._expire(keys=self._keys,
+                            args=[time.time(), self.max_attempts, self.result_ttl])
+
+    def claim(self, worker_id):
+        """
+        Claim the oldest pending job, first releasing jobs with expired leases.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker
+
+        Returns:
+            dict: The claimed job with job_id, frame, frame_path, image, lang
+            and preprocessing keys, or None if no job is available
+        """
+        job_id = self._claim(keys=self._keys,
+                             args=[worker_id, time.time(), self.lease_seconds, self.max_attempts,
+                                   self.result_ttl])
+        if job_id is None:
+            return None
+        job_id = job_id.decode("utf-8")
+        job = self._job(job_id, 'frame', 'frame_path', 'image', 'lang', 'preprocessing')
+        job['job_id'] = job_id
+        return job
+
+    def complete(self, job_id, worker_id, text):
+        """
+        Record the OCR result of a claimed job and drop its embedded image.
+
+        Results from a worker whose lease was already taken over are ignored.
+
+        Args:
+            job_id (str): Id of the completed job
+            worker_id (str): Identifier of the worker holding the job
+            text (str): Extracted text
+
+        Returns:
+            bool: True if the result was recorded
+        """
+        return self._complete(keys=self._keys,
+                              args=[job_id, worker_id, text, self.result_ttl]) == 1
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Record a failed attempt, requeueing the job if attempts remain.
+
+        Args:
+            job_id (str): Id of the failed job
+            worker_id (str): Identifier of the worker holding the job
+            error (str): Description of the failure
+        """
+        self._fail(keys=self._keys,
+                   args=[job_id, worker_id, error, self.max_attempts, self.result_ttl])
+
+    def result(self, job_id):
+        """
+        Look up the state of a job.
+
+        Args:
+            job_id (str): Id of the job
+
+        Returns:
+            dict: Job with frame, status, text and error keys
+        """
+        return self._job(job_id, 'frame', 'status', 'text', 'error')
+
+def open_broker(location, **kwargs):
+    """
+    Open the broker for a queue location.
+
+    Args:
+        location (str): redis:// or rediss:// URL for a RedisBroker, otherwise
+            the path of a SQLiteBroker database
+        **kwargs: Options passed to the broker (lease_seconds, max_attempts,
+            result_ttl)
+
+    Returns:
+        RedisBroker or SQLiteBroker: The opened broker
+    """
+    if location.startswith(("redis://", "rediss://")):
+        return RedisBroker(location, **kwargs)
+    return SQLiteBroker(location, **kwargs)
+
+def _default_ocr(frame_path, lang='eng', preprocessing='otsu'):
+    """
+    Run the standard single-frame OCR, importing OpenCV and Tesseract lazily.
+    """
+    from src.ocr_processing import extract_frame_text
+    return extract_frame_text(frame_path, lang, preprocessing)
+
+def run_worker(broker, worker_id=None, ocr_func=None, idle_timeout=None, poll_interval=0.5):
+    """
+    Claim and process frame jobs until the queue stays empty.
+
+    Args:
+        broker (SQLiteBroker or RedisBroker): Broker to take jobs from
+        worker_id (str): Identifier of this worker (default: host name plus a random suffix)
+        ocr_func (callable): Function mapping a frame path, language and
+            preprocessing pipeline name to its text
+            (default: ocr_processing.extract_frame_text)
+        idle_timeout (float): Seconds to wait for new jobs before returning,
+            or None to run forever
+        poll_interval (float): Seconds between checks when the queue is empty
+
+    Returns:
+        int: Number of jobs completed by this worker
+    """
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+    if ocr_func is None:
+        ocr_func = _default_ocr
+
+    completed = 0
+    idle_since = time.time()
+    while True:
+        job = broker.claim(worker_id)
+        if job is None:
+            if idle_timeout is not None and time.time() - idle_since > idle_timeout:
+                return completed
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            if job['image'] is not None:
+                # Image bytes were shipped with the job; OCR reads from a file
+                suffix = os.path.splitext(job['frame'])[1]
+                with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                    f.write(job['image'])
+                try:
+                    text = ocr_func(f.name, job['lang'], job['preprocessing'])
+                finally:
+                    os.remove(f.name)
+            else:
+                text = ocr_func(job['frame_path'], job['lang'], job['preprocessing'])
+            if broker.complete(job['job_id'], worker_id, text):
+                completed += 1
+        except Exception as e:
+            print(f"Error processing frame {job['frame']}: {str(e)}")
+            broker.fail(job['job_id'], worker_id, str(e))
+        idle_since = time.time()
+
+def iter_frames_distributed(frames_dir, broker, embed_images=False, timeout=None, lang='eng',
+                            preprocessing='otsu'):
+    """
+    Publish all frames in a directory to a broker and yield results in order.
+
+    Args:
+        frames_dir (str): Directory containing the frame images (PNG format)
+        broker (SQLiteBroker or RedisBroker): Broker shared with the OCR workers
+        embed_images (bool): Ship image bytes with each job instead of a
+            path, for workers without access to the frames directory
+        timeout (float): Seconds to wait for all results, or None to wait forever
+        lang (str): Tesseract language code(s) for the OCR
+        preprocessing (str): Preprocessing pipeline name for the OCR
+
+    Yields:
+        dict: Frame information for each frame that contains text:
+            - frame (str): Frame filename
+            - text (str): Extracted text from the frame
+
+    Raises:
+        FileNotFoundError: If the frames directory doesn't exist
+        TimeoutError: If the workers do not finish within the timeout
+    """
+    if not os.path.exists(frames_dir):
+        raise FileNotFoundError(f"Frames directory not found: {frames_dir}")
+
+    def frames():
+        for frame_file in sorted(os.listdir(frames_dir)):
+            if frame_file.endswith(".png"):
+                frame_path = os.path.abspath(os.path.join(frames_dir, frame_file))
+                image = None
+                if embed_images:
+                    with open(frame_path, "rb") as f:
+                        image = f.read()
+                yield frame_file, frame_path, image
+
+    job_ids = broker.publish(frames(), lang, preprocessing)
+    for row in broker.iter_results(job_ids, timeout=timeout):
+        if row['status'] == 'failed':
+            print(f"Error processing frame {row['frame']}: {row['error']}")
+        elif row['text']:
+            yield {
+                'frame': row['frame'],
+                'text': row['text']
+            }
@@ -0,0 +1,393 @@
+"""
+Results Module
+
+This module defines the typed result schema of the pipeline and its
+serialization. A processed video is a VideoResult holding flat FrameRecord,
+CaptionRecord and AnalysisRecord rows with numeric times, so a corpus of
+results can be stored as JSONL, reloaded without re-running the pipeline,
+and optionally exported to Parquet tables (frames, captions, analyses,
+videos) for analytics.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, asdict, fields
+
+@dataclass
+class VideoRecord:
+    """
+    Identity of a processed video.
+    """
+    __slots__ = ('video_id', 'url', 'title')
+    video_id: str
+    url: str
+    title: str
+
+@dataclass
+class FrameRecord:
+    """
+    Text extracted from one frame; ``time`` is the offset in seconds and
+    ``confidence`` is None unless confidence-aware OCR was used.
+    """
+    __slots__ = ('video_id', 'frame', 'time', 'text', 'confidence')
+    video_id: str
+    frame: str
+    time: float
+    text: str
+    confidence: float
+
+@dataclass
+class CaptionRecord:
+    """
+    One caption of a subtitle track, with start and end in seconds.
+    """
+    __slots__ = ('video_id', 'lang', 'kind', 'start', 'end', 'text')
+    video_id: str
+    lang: str
+    kind: str
+    start: float
+    end: float
+    text: str
+
+@dataclass
+class AnalysisRecord:
+    """
+    One LLM analysis of a video's transcript or frame text; ``window`` is
+    the index of the analyzed window in bounded-memory mode.
+    """
+    __slots__ = ('video_id', 'source', 'window', 'model', 'content',
+                 'prompt_tokens', 'completion_tokens')
+    video_id: str
+    source: str
+    window: int
+    model: str
+    content: str
+    prompt_tokens: int
+    completion_tokens: int
+
+# Record type name used in JSONL lines and as Parquet table name
+_RECORD_TYPES = {
+    'videos': VideoRecord,
+    'frames': FrameRecord,
+    'captions': CaptionRecord,
+    'analyses': AnalysisRecord,
+}
+_TABLE_NAMES = {cls: name for name, cls in _RECORD_TYPES.items()}
+
+class VideoResult:
+    """
+    All results of processing one video.
+
+    Attributes:
+        video (VideoRecord): Identity of the video
+        frames (list): FrameRecord rows in frame order
+        captions (list): CaptionRecord rows in track and time order
+        analyses (list): AnalysisRecord rows
+    """
+    __slots__ = ('video', 'frames', 'captions', 'analyses')
+
+    def __init__(self, video, frames=None, captions=None, analyses=None):
+        self.video = video
+        self.frames = frames if frames is not None else []
+        self.captions = captions if captions is not None else []
+        self.analyses = analyses if analyses is not None else []
+
+    def records(self):
+        """
+        Iterate over all records of the video, starting with its VideoRecord.
+
+        Yields:
+            The VideoRecord followed by frame, caption and analysis records
+        """
+        yield self.video
+        yield from self.frames
+        yield from self.captions
+        yield from self.analyses
+
+    def analysis(self, source):
+        """
+        Join the analysis text of one source ('transcript' or 'frames').
+
+        Args:
+            source (str): Analysis source
+
+        Returns:
+            str: Contents of the matching analyses in window order
+        """
+        rows = sorted((a for a in self.analyses if a.source == source), key=lambda a: a.window)
+        return "\n\n".join(a.content for a in rows)
+
+_TIMESTAMP = re.compile(r"^(?:(\d+):)?(\d+):(\d+(?:\.\d+)?)$")
+_FRAME_NUMBER = re.compile(r"(\d+)(?=\.\w+$)")
+
+def parse_timestamp(timestamp):
+    """
+    Convert a VTT timestamp to seconds.
+
+    Args:
+        timestamp (str): Timestamp such as '01:02:03.500' or '02:03.500'
+
+    Returns:
+        float: Offset in seconds
+
+    Raises:
+        ValueError: If the timestamp is malformed
+    """
+    match = _TIMESTAMP.match(timestamp.strip())
+    if not match:
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    hours, minutes, seconds = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)
+
+def frame_time(frame, frame_rate):
+    """
+    Compute the video offset of an extracted frame from its filename.
+
+    Frames are numbered from 1 by ffmpeg at ``frame_rate`` frames per second.
+
+    Args:
+        frame (str): Frame filename, e.g. 'frame_0031.png'
+        frame_rate (float): Frame extraction rate in frames per second
+
+    Returns:
+        float: Offset in seconds, or None if the filename has no frame number
+    """
+    match = _FRAME_NUMBER.search(frame)
+    if not match:
+        return None
+    return (int(match.group(1)) - 1) / frame_rate
+
+def frame_records(video_id, frame_texts, frame_rate):
+    """
+    Convert process_frames output to FrameRecord rows.
+
+    Args:
+        video_id (str): Id of the video
+        frame_texts (iterable): Frame dictionaries with 'frame' and 'text' keys
+        frame_rate (float): Frame extraction rate in frames per second
+
+    Yields:
+        FrameRecord: One row per frame
+    """
+    for f in frame_texts:
+        yield FrameRecord(video_id, f['frame'], frame_time(f['frame'], frame_rate),
+                          f['text'], f.get('confidence'))
+
+def caption_records(video_id, captions, lang, kind):
+    """
+    Convert parsed captions of one subtitle track to CaptionRecord rows.
+
+    Args:
+        video_id (str): Id of the video
+        captions (iterable): Caption dictionaries with 'start', 'end' and 'text' keys
+        lang (str): Language of the track
+        kind (str): Kind of the track ('manual' or 'automatic')
+
+    Yields:
+        CaptionRecord: One row per caption
+    """
+    for c in captions:
+        yield CaptionRecord(video_id, lang, kind, parse_timestamp(c['start']),
+                            parse_timestamp(c['end']), c['text'])
+
+def analysis_record(video_id, source, completion, window=0):
+    """
+    Convert a Groq chat completion to an AnalysisRecord.
+
+    Args:
+        video_id (str): Id of the video
+        source (str): What was analyzed ('transcript' or 'frames')
+        completion: Chat completion returned by process_content
+        window (int): Index of the analyzed window
+
+    Returns:
+        AnalysisRecord: The analysis row
+    """
+    usage = getattr(completion, 'usage', None)
+    return AnalysisRecord(
+        video_id, source, window, completion.model,
+        completion.choices[0].message.content,
+        getattr(usage, 'prompt_tokens', None),
+        getattr(usage, 'completion_tokens', None)
+    )
+
+def _to_dict(record):
+    """
+    Serialize a record to a JSON-ready dictionary tagged with its table name.
+    """
+    data = {'table': _TABLE_NAMES[type(record)]}
+    data.update(asdict(record))
+    return data
+
+def _from_dict(data):
+    """
+    Rebuild a record from a dictionary written by _to_dict.
+    """
+    cls = _RECORD_TYPES[data.pop('table')]
+    return cls(**data)
+
+def write_jsonl(results, path, append=True):
+    """
+    Write video results to a JSONL file, one record per line.
+
+    Args:
+        results (iterable): VideoResult objects, or records from
+            VideoResult.records() for results that are streamed
+        path (str): Destination file
+        append (bool): Append to an existing corpus file (default) or replace it
+
+    Returns:
+        int: Number of records written
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = 0
+    with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+        for result in results:
+            records = result.records() if isinstance(result, VideoResult) else [result]
+            for record in records:
+                f.write(json.dumps(_to_dict(record), ensure_ascii=False))
+                f.write("\n")
+                written += 1
+    return written
+
+def iter_records(path):
+    """
+    Lazily read records from a JSONL results file.
+
+    Args:
+        path (str): File written by write_jsonl
+
+    Yields:
+        Records (VideoRecord, FrameRecord, CaptionRecord or AnalysisRecord)
+        in file order
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield _from_dict(json.loads(line))
+
+def iter_video_results(path):
+    """
+    Lazily load video results from a JSONL results file, one video at a time.
+
+    write_jsonl writes the records of each video together, so a video is
+    complete once a record of another video appears and only one video is
+    held in memory. A video written more than once is yielded once per write.
+
+    Args:
+        path (str): File written by write_jsonl
+
+    Yields:
+        VideoResult: Results of each video in file order
+    """
+    result = None
+    for record in iter_records(path):
+        if isinstance(record, VideoRecord):
+            if result is not None:
+                yield result
+            result = VideoResult(record)
+            continue
+        if result is None or record.video_id != result.video.video_id:
+            if result is not None:
+                yield result
+            result = VideoResult(VideoRecord(record.video_id, None, None))
+        getattr(result, _TABLE_NAMES[type(record)]).append(record)
+    if result is not None:
+        yield result
+
+def read_jsonl(path):
+    """
+    Load video results from a JSONL results file.
+
+    Args:
+        path (str): File written by write_jsonl
+
+    Returns:
+        list: VideoResult objects in file order
+    """
+    results = {}
+    for record in iter_records(path):
+        if isinstance(record, VideoRecord):
+            results[record.video_id] = VideoResult(record)
+        else:
+            if record.video_id not in results:
+                results[record.video_id] = VideoResult(VideoRecord(record.video_id, None, None))
+            result = results[record.video_id]
+            getattr(result, _TABLE_NAMES[type(record)]).append(record)
+    return list(results.values())
+
+# Rows buffered per table before they are written as one Parquet row group
+PARQUET_BATCH_ROWS = 10000
+
+def _parquet_schema(pa, cls):
+    """
+    Build the Parquet schema of a record type from its field annotations.
+    """
+    types = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+    return pa.schema([pa.field(field.name, types[field.type]) for field in fields(cls)])
+
+def export_parquet(results, directory):
+    """
+    Export video results to one Parquet file per table.
+
+    Records are streamed to the files in batches of PARQUET_BATCH_ROWS, so
+    memory stays flat however large the corpus is, and every table has a
+    fixed schema derived from its record type (a column that is empty in
+    one export has the same type as in any other).
+
+    Requires the optional pyarrow dependency.
+
+    Args:
+        results (iterable): VideoResult objects or their records, e.g.
+            iter_records() of a JSONL corpus
+        directory (str): Output directory for videos.parquet, frames.parquet,
+            captions.parquet and analyses.parquet
+
+    Returns:
+        dict: Mapping of table name to the written file path
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+    os.makedirs(directory, exist_ok=True)
+    paths, writers, buffers = {}, {}, {}
+    try:
+        for name, cls in _RECORD_TYPES.items():
+            paths[name] = os.path.join(directory, f"{name}.parquet")
+            writers[name] = pq.ParquetWriter(paths[name], _parquet_schema(pa, cls))
+            buffers[name] = []
+
+        def flush(name):
+            writer = writers[name]
+            columns = {
+                column: [getattr(record, column) for record in buffers[name]]
+                for column in writer.schema.names
+            }
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=writer.schema))
+            buffers[name] = []
+
+        for result in results:
+            records = result.records() if isinstance(result, VideoResult) else [result]
+            for record in records:
+                name = _TABLE_NAMES[type(record)]
+                buffers[name].append(record)
+                if len(buffers[name]) >= PARQUET_BATCH_ROWS:
+                    flush(name)
+
+        for name in writers:
+            if buffers[name]:
+                flush(name)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return paths
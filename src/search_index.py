@@ -0,0 +1,278 @@
+"""
+Search Index Module
+
+This module maintains a local full-text index over the OCR text and
+captions of processed videos, so questions like "which video showed
+`docker compose up`" are answered in milliseconds instead of by grepping
+output dumps or reprocessing videos.
+
+The index is a SQLite database with an FTS5 table. Videos are ingested
+incrementally: re-ingesting a video replaces its previous entries. Runs of
+consecutive frames showing the same screen (allowing for OCR noise) are
+stored once with the time range they cover.
+"""
+
+import itertools
+import sqlite3
+import time
+from src.code_reconstruction import is_same_screen
+from src.results import frame_records, caption_records
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    ref TEXT,
+    start_time REAL,
+    end_time REAL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_video ON segments (video_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5 (
+    text, content='segments', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS segments_insert AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_delete AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+def _frame_segments(frames):
+    """
+    Collapse runs of consecutive frames showing the same screen into segments.
+
+    The text of a run is the text of its first frame; later frames only
+    extend its time range, even if OCR noise makes their text differ.
+
+    Args:
+        frames (iterable): FrameRecord rows in frame order
+
+    Yields:
+        tuple: (source, ref, start, end, text) with ref naming the first frame
+    """
+    run = None
+    for frame in frames:
+        if run is not None and is_same_screen(run[4], frame.text):
+            run[3] = frame.time
+            continue
+        if run is not None:
+            yield tuple(run)
+        run = ['frame', frame.frame, frame.time, frame.time, frame.text]
+    if run is not None:
+        yield tuple(run)
+
+def _caption_segments(captions):
+    """
+    Convert caption records to segments.
+
+    Args:
+        captions (iterable): CaptionRecord rows
+
+    Yields:
+        tuple: (source, ref, start, end, text) with ref naming the track
+    """
+    for caption in captions:
+        yield ('caption', f"{caption.lang}.{caption.kind}", caption.start, caption.end, caption.text)
+
+class SearchIndex:
+    """
+    Full-text index over the OCR text and captions of processed videos.
+
+    Attributes:
+        path (str): Location of the SQLite database
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def ingest_result(self, result):
+        """
+        Add or replace a processed video in the index.
+
+        Args:
+            result (VideoResult): Typed results of the video
+
+        Returns:
+            int: Number of segments indexed for the video
+        """
+        return self.ingest_records(result.video, result.frames, result.captions)
+
+    def ingest_records(self, video, frames=(), captions=()):
+        """
+        Add or replace a video in the index from streams of typed records.
+
+        Args:
+            video (VideoRecord): Identity of the video
+            frames (iterable): FrameRecord rows in frame order
+            captions (iterable): CaptionRecord rows of any number of tracks
+
+        Returns:
+            int: Number of segments indexed for the video
+        """
+        segments = itertools.chain(_frame_segments(frames), _caption_segments(captions))
+        return self._replace(video.video_id, video.url, video.title, segments)
+
+    def ingest_video(self, video_id, frame_texts=(), captions=(), frame_rate=0.5,
+                     lang='en', kind='manual', url=None, title=None):
+        """
+        Add or replace a video in the index from raw pipeline output.
+
+        Frames and captions are consumed one at a time, so they can be
+        streamed from spill files.
+
+        Args:
+            video_id (str): Id of the video
+            frame_texts (iterable): Frame dictionaries as returned by process_frames
+            captions (iterable): Caption dictionaries as returned by process_transcript
+            frame_rate (float): Frame extraction rate used for the frames
+            lang (str): Language of the captions
+            kind (str): Kind of the caption track ('manual' or 'automatic')
+            url (str): URL of the video
+            title (str): Title of the video
+
+        Returns:
+            int: Number of segments indexed for the video
+        """
+        segments = itertools.chain(
+            _frame_segments(frame_records(video_id, frame_texts, frame_rate)),
+            _caption_segments(caption_records(video_id, captions, lang, kind))
+        )
+        return self._replace(video_id, url, title, segments)
+
+    def _replace(self, video_id, url, title, segments):
+        """
+        Replace all entries of a video in a single transaction.
+        """
+        count = 0
+
+        def rows():
+            nonlocal count
+            for segment in segments:
+                count += 1
+                yield (video_id,) + segment
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, url, title, ingested_at) "
+                "VALUES (?, ?, ?, ?)",
+                (video_id, url, title, time.time())
+            )
+            self._conn.executemany(
+                "INSERT INTO segments (video_id, source, ref, start_time, end_time, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows()
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def remove_video(self, video_id):
+        """
+        Remove a video and all of its entries from the index.
+
+        Args:
+            video_id (str): Id of the video
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            self._conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def search(self, query, limit=20, phrase=True, source=None):
+        """
+        Find the videos and time offsets where text appeared.
+
+        Args:
+            query (str): Text to look for
+            limit (int): Maximum number of hits
+            phrase (bool): Match the query as an exact phrase; when False it
+                is passed to FTS5 as a query expression (AND, OR, prefix*, ...)
+            source (str): Restrict hits to 'frame' or 'caption' segments
+
+        Returns:
+            list: Hits ordered by relevance, each a dictionary with:
+                - video_id (str): Id of the video
+                - title (str): Title of the video
+                - source (str): 'frame' or 'caption'
+                - ref (str): First frame name or caption track
+                - start (float): Offset in seconds where the text appeared
+                - end (float): Offset in seconds where it was last seen
+                - snippet (str): Matching text with the match in [brackets]
+
+        Raises:
+            ValueError: If the query is not a valid FTS5 expression
+        """
+        match = '"' + query.replace('"', '""') + '"' if phrase else query
+        sql = (
+            "SELECT s.video_id, v.title, s.source, s.ref, s.start_time, s.end_time, "
+            "snippet(segments_fts, 0, '[', ']', '...', 12) AS snippet "
+            "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+            "LEFT JOIN videos v ON v.video_id = s.video_id "
+            "WHERE segments_fts MATCH ?"
+        )
+        params = [match]
+        if source is not None:
+            sql += " AND s.source = ?"
+            params.append(source)
+        sql += " ORDER BY segments_fts.rank LIMIT ?"
+        params.append(limit)
+        try:
+            rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            if phrase:
+                raise
+            raise ValueError(f"Invalid search expression {query!r}: {str(e)}")
+        return [
+            {
+                'video_id': row['video_id'],
+                'title': row['title'],
+                'source': row['source'],
+                'ref': row['ref'],
+                'start': row['start_time'],
+                'end': row['end_time'],
+                'snippet': row['snippet']
+            }
+            for row in rows
+        ]
+
+    def video_ids(self):
+        """
+        List the ids of all indexed videos.
+
+        Returns:
+            list: Video ids in ingestion order
+        """
+        rows = self._conn.execute("SELECT video_id FROM videos ORDER BY ingested_at")
+        return [row['video_id'] for row in rows]
@@ -0,0 +1,68 @@
+"""
+Spill Store Module
+
+This module provides an on-disk JSONL store for intermediate pipeline
+results. Stages that produce one record at a time (frames, captions) write
+into a spool instead of building lists, and later stages read the records
+back lazily, so peak memory does not grow with the length of the video.
+"""
+
+import json
+import os
+
+class JsonlSpool:
+    """
+    Append-only JSONL file of pipeline records that can be re-read lazily.
+
+    Attributes:
+        path (str): Location of the JSONL file
+        count (int): Number of records written through this spool
+    """
+
+    def __init__(self, path):
+        """
+        Create an empty spool, replacing any previous file at the path.
+
+        Args:
+            path (str): Location of the JSONL file
+        """
+        self.path = path
+        self.count = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open(path, 'w', encoding='utf-8').close()
+
+    def write(self, records):
+        """
+        Append records to the spool, consuming them one at a time.
+
+        Args:
+            records (iterable): JSON-serializable records, usually a generator
+
+        Returns:
+            int: Number of records written by this call
+        """
+        written = 0
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write("\n")
+                written += 1
+        self.count += written
+        return written
+
+    def __iter__(self):
+        """
+        Read records back from disk one line at a time.
+
+        Yields:
+            The decoded records in the order they were written
+        """
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self):
+        return self.count
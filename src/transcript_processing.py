@@ -2,42 +2,102 @@
 Transcript Processing Module
 
 This module handles the extraction of transcripts from YouTube videos.
-It uses yt-dlp for subtitle downloading and webvtt for parsing VTT format subtitles.
+It uses the shared yt-dlp metadata (see video_metadata) to find subtitle tracks
+and webvtt for parsing VTT format subtitles.
 The module provides functionality to download, parse, and structure video captions.
 """
 
-import yt_dlp
 import webvtt
 import os
 import glob
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from src.video_metadata import resolve_video_info
 
-def process_transcript(video_url):
+# Track kinds in default order of preference
+TRACK_KINDS = ('manual', 'automatic')
+
+def list_subtitle_tracks(info):
     """
-    Download and process subtitles from a YouTube video.
+    List the VTT subtitle tracks available for a video.
+    
+    Args:
+        info (dict): Video metadata as returned by yt-dlp's extract_info
+        
+    Returns:
+        dict: Mapping of (language, kind) to the track's VTT URL, where kind
+        is 'manual' for uploaded subtitles and 'automatic' for auto-generated
+        captions
+    """
+    tracks = {}
+    sources = (('manual', 'subtitles'), ('automatic', 'automatic_captions'))
+    for kind, key in sources:
+        for lang, formats in (info.get(key) or {}).items():
+            for fmt in formats:
+                if fmt.get('ext') == 'vtt' and fmt.get('url'):
+                    tracks[(lang, kind)] = fmt['url']
+                    break
+    return tracks
+
+def select_tracks(tracks, languages, kinds=TRACK_KINDS, all_kinds=False):
+    """
+    Deterministically choose which subtitle tracks to fetch.
+    
+    Args:
+        tracks (dict): Available tracks as returned by list_subtitle_tracks
+        languages (list): Requested language codes in order of priority
+        kinds (tuple): Track kinds in order of preference
+        all_kinds (bool): Fetch every requested kind of each language instead
+            of only the most preferred one available
+        
+    Returns:
+        list: Selected (language, kind) keys in request order
+    """
+    selected = []
+    for lang in languages:
+        for kind in kinds:
+            if (lang, kind) in tracks:
+                selected.append((lang, kind))
+                if not all_kinds:
+                    break
+    return selected
+
+def _fetch_track(url, path):
+    """
+    Download a single subtitle track to a local file.
+    """
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def download_transcripts(video_url, languages=('en',), kinds=TRACK_KINDS, all_kinds=False,
+                         max_workers=4, info=None):
+    """
+    Download subtitles of a YouTube video in several languages in one pass.
+    
+    The video metadata lists the available tracks, and the selected tracks
+    are then fetched concurrently.
     
     Args:
         video_url (str): URL of the YouTube video to extract subtitles from
+        languages (list): Language codes in order of priority (default: English)
+        kinds (tuple): Track kinds in order of preference
+        all_kinds (bool): Fetch every requested kind of each language instead
+            of only the most preferred one available
+        max_workers (int): Maximum number of concurrent track downloads
+        info (dict): Video metadata from resolve_video_info (default: resolved
+            through the shared metadata cache)
         
     Returns:
-        list: List of dictionaries containing caption information:
-            - start (str): Caption start time
-            - end (str): Caption end time
-            - text (str): Caption text content
-            
+        dict: Mapping of (language, kind) to the downloaded VTT file path,
+        in request order
+        
     Raises:
         Exception: If subtitle download fails or no subtitles are available
-        FileNotFoundError: If the downloaded subtitle file cannot be found
     """
     base_path = "transcript"
-    ydl_opts = {
-        'skip_download': True,          # Don't download the video
-        'writesubtitles': True,         # Download subtitles if available
-        'writeautomaticsub': True,      # Download auto-generated subtitles if manual not available
-        'subtitleslangs': ['en'],       # Download English subtitles
-        'subtitlesformat': 'vtt',       # Use VTT format
-        'outtmpl': base_path,           # Output template for subtitle file
-        'quiet': True,                  # Suppress yt-dlp output
-    }
     
     # Clean up any existing VTT files
     for vtt_file in glob.glob(f"{base_path}*.vtt"):
@@ -45,30 +105,117 @@ def process_transcript(video_url):
             os.remove(vtt_file)
         except:
             pass
-            
-    # Download subtitles
+    
+    # List the available tracks
+    if info is None:
+        try:
+            info = resolve_video_info(video_url)
+        except Exception as e:
+            raise Exception(f"Failed to download subtitles: {str(e)}")
+    
+    tracks = list_subtitle_tracks(info)
+    selected = select_tracks(tracks, languages, kinds, all_kinds)
+    if not selected:
+        raise Exception("No subtitle file was downloaded. The video might not have subtitles available.")
+    
+    # Fetch the selected tracks concurrently
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                key: executor.submit(_fetch_track, tracks[key], f"{base_path}.{key[0]}.{key[1]}.vtt")
+                for key in selected
+            }
+            return {key: future.result() for key, future in futures.items()}
     except Exception as e:
         raise Exception(f"Failed to download subtitles: {str(e)}")
+
+def download_transcript(video_url, lang='en', info=None):
+    """
+    Download the subtitles of a YouTube video to a local VTT file.
     
-    # Find the downloaded VTT file
-    vtt_files = glob.glob(f"{base_path}*.vtt")
-    if not vtt_files:
-        raise Exception("No subtitle file was downloaded. The video might not have subtitles available.")
+    Uploaded subtitles are preferred over auto-generated captions.
     
-    transcript_path = vtt_files[0]
+    Args:
+        video_url (str): URL of the YouTube video to extract subtitles from
+        lang (str): Language code of the subtitles (default: en)
+        info (dict): Video metadata from resolve_video_info (optional)
+        
+    Returns:
+        str: Path to the downloaded VTT file
+        
+    Raises:
+        Exception: If subtitle download fails or no subtitles are available
+    """
+    paths = download_transcripts(video_url, [lang], info=info)
+    return next(iter(paths.values()))
+
+def iter_captions(transcript_path):
+    """
+    Lazily parse captions from a VTT file.
     
-    # Parse the transcript
+    Args:
+        transcript_path (str): Path to the VTT subtitle file
+        
+    Yields:
+        dict: Caption information:
+            - start (str): Caption start time
+            - end (str): Caption end time
+            - text (str): Caption text content
+            
+    Raises:
+        Exception: If the subtitle file cannot be parsed
+    """
     try:
-        captions = []
-        for caption in webvtt.read(transcript_path):
-            captions.append({
-                'start': caption.start,
-                'end': caption.end,
-                'text': caption.text.strip()
-            })
-        return captions
+        vtt = webvtt.read(transcript_path)
     except Exception as e:
-        raise Exception(f"Failed to parse subtitle file: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"Failed to parse subtitle file: {str(e)}")
+    
+    for caption in vtt:
+        yield {
+            'start': caption.start,
+            'end': caption.end,
+            'text': caption.text.strip()
+        }
+
+def process_transcripts(video_url, languages=('en',), kinds=TRACK_KINDS, all_kinds=False,
+                        info=None):
+    """
+    Download and process subtitles of a YouTube video in several languages.
+    
+    Args:
+        video_url (str): URL of the YouTube video to extract subtitles from
+        languages (list): Language codes in order of priority (default: English)
+        kinds (tuple): Track kinds in order of preference
+        all_kinds (bool): Fetch every requested kind of each language instead
+            of only the most preferred one available
+        info (dict): Video metadata from resolve_video_info (optional)
+        
+    Returns:
+        dict: Mapping of (language, kind) to a list of caption dictionaries
+        (see process_transcript), in request order
+        
+    Raises:
+        Exception: If subtitle download fails or no subtitles are available
+    """
+    paths = download_transcripts(video_url, languages, kinds, all_kinds, info=info)
+    return {key: list(iter_captions(path)) for key, path in paths.items()}
+
+def process_transcript(video_url):
+    """
+    Download and process subtitles from a YouTube video.
+    
+    Args:
+        video_url (str): URL of the YouTube video to extract subtitles from
+        
+    Returns:
+        list: List of dictionaries containing caption information:
+            - start (str): Caption start time
+            - end (str): Caption end time
+            - text (str): Caption text content
+            
+    Raises:
+        Exception: If subtitle download fails or no subtitles are available
+        FileNotFoundError: If the downloaded subtitle file cannot be found
+    """
+    transcript_path = download_transcript(video_url)
+    return list(iter_captions(transcript_path))
@@ -0,0 +1,168 @@
+"""
+Video Metadata Module
+
+This module resolves the yt-dlp metadata (info dict) of a video once and
+shares it between the pipeline stages. Video format selection and subtitle
+retrieval both read from the same info dict instead of each stage running
+the extractor against the URL again.
+
+Resolved metadata is cached on disk for a limited time, since the media
+URLs it contains expire, and the most recently used videos are also kept
+in memory. The cache location and lifetime come from the
+METADATA_CACHE_DIR and METADATA_CACHE_TTL settings.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import time
+
+# Videos whose metadata is kept in memory; an info dict is often around 1 MB
+# because of its format list, so only the videos of the current run are kept
+MEMORY_CACHE_SIZE = 4
+
+# Video URL -> (fetched_at, info), least recently used first
+_memory_cache = collections.OrderedDict()
+
+def _cache_dir(cache_dir):
+    """
+    Resolve a cache directory argument, defaulting to METADATA_CACHE_DIR.
+    """
+    if cache_dir is None:
+        from src.config import METADATA_CACHE_DIR
+        return METADATA_CACHE_DIR
+    return cache_dir
+
+def _cache_ttl(ttl):
+    """
+    Resolve a time to live argument, defaulting to METADATA_CACHE_TTL.
+    """
+    if ttl is None:
+        from src.config import METADATA_CACHE_TTL
+        return METADATA_CACHE_TTL
+    return ttl
+
+def _remember(video_url, fetched_at, info):
+    """
+    Keep metadata in the in-memory cache, evicting the least recently used.
+    """
+    _memory_cache[video_url] = (fetched_at, info)
+    _memory_cache.move_to_end(video_url)
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+def cache_path(video_url, cache_dir=None):
+    """
+    Return the cache file used for a video URL.
+
+    Args:
+        video_url (str): URL of the video
+        cache_dir (str): Directory of the on-disk cache (default: METADATA_CACHE_DIR)
+
+    Returns:
+        str: Path of the JSON cache file
+    """
+    cache_dir = _cache_dir(cache_dir)
+    digest = hashlib.sha256(video_url.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.json")
+
+def load_cached_info(video_url, cache_dir=None, ttl=None):
+    """
+    Load metadata from the on-disk cache if it is still valid.
+
+    Args:
+        video_url (str): URL of the video
+        cache_dir (str): Directory of the on-disk cache (default: METADATA_CACHE_DIR)
+        ttl (float): Maximum age of the cached metadata in seconds
+            (default: METADATA_CACHE_TTL)
+
+    Returns:
+        dict: The cached info dict, or None if missing, unreadable or expired
+    """
+    ttl = _cache_ttl(ttl)
+    path = cache_path(video_url, cache_dir)
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - entry.get('fetched_at', 0) > ttl:
+        return None
+    return entry.get('info')
+
+def save_cached_info(video_url, info, cache_dir=None):
+    """
+    Store metadata in the on-disk cache.
+
+    Args:
+        video_url (str): URL of the video
+        info (dict): JSON-serializable info dict
+        cache_dir (str): Directory of the on-disk cache (default: METADATA_CACHE_DIR)
+    """
+    cache_dir = _cache_dir(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(video_url, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({'fetched_at': time.time(), 'url': video_url, 'info': info}, f)
+    os.replace(tmp_path, path)
+
+def _extract_info(video_url):
+    """
+    Run the yt-dlp extractor for a video without downloading anything.
+    """
+    import yt_dlp
+
+    ydl_opts = {
+        'skip_download': True,  # Only resolve metadata
+        'quiet': True,          # Suppress yt-dlp output
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+        return ydl.sanitize_info(info)
+
+def resolve_video_info(video_url, cache_dir=None, ttl=None, refresh=False):
+    """
+    Resolve the metadata of a video, using the in-memory and on-disk caches.
+
+    Args:
+        video_url (str): URL of the video
+        cache_dir (str): Directory of the on-disk cache, or '' to disable it
+            (default: METADATA_CACHE_DIR)
+        ttl (float): Maximum age of cached metadata in seconds
+            (default: METADATA_CACHE_TTL)
+        refresh (bool): Ignore cached metadata and run the extractor again
+
+    Returns:
+        dict: JSON-serializable yt-dlp info dict, including the available
+        formats ('formats'), subtitles ('subtitles') and automatic captions
+        ('automatic_captions')
+
+    Raises:
+        Exception: If the metadata cannot be extracted
+    """
+    cache_dir, ttl = _cache_dir(cache_dir), _cache_ttl(ttl)
+    now = time.time()
+    if not refresh:
+        cached = _memory_cache.get(video_url)
+        if cached is not None and now - cached[0] <= ttl:
+            _memory_cache.move_to_end(video_url)
+            return cached[1]
+
+        if cache_dir:
+            info = load_cached_info(video_url, cache_dir, ttl)
+            if info is not None:
+                _remember(video_url, now, info)
+                return info
+
+    try:
+        info = _extract_info(video_url)
+    except Exception as e:
+        raise Exception(f"Failed to extract video metadata: {str(e)}")
+
+    _remember(video_url, now, info)
+    if cache_dir:
+        save_cached_info(video_url, info, cache_dir)
+    return info
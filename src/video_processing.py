@@ -2,22 +2,28 @@
 Video Processing Module
 
 This module handles the downloading and frame extraction of YouTube videos.
-It uses yt-dlp for video downloading and ffmpeg for frame extraction.
+It uses yt-dlp for video downloading and ffmpeg for frame extraction. Format
+selection works on the shared video metadata (see video_metadata), so the
+URL is not resolved again.
 The frame rate and other configurations are controlled via config.py.
 """
 
 import yt_dlp
 import ffmpeg
+import copy
 import os
 import shutil
 from src.config import FRAME_RATE
+from src.video_metadata import resolve_video_info
 
-def process_video(video_url):
+def process_video(video_url, info=None):
     """
     Download a YouTube video and extract frames at specified intervals.
 
     Args:
         video_url (str): URL of the YouTube video to process
+        info (dict): Video metadata from resolve_video_info (default: resolved
+            through the shared metadata cache)
 
     Returns:
         tuple: (video_path, frames_dir) where:
@@ -37,8 +43,11 @@ def process_video(video_url):
     }
     
     try:
+        if info is None:
+            info = resolve_video_info(video_url)
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
+            # Select formats and download from the already resolved metadata
+            ydl.process_ie_result(copy.deepcopy(info), download=True)
     except Exception as e:
         print(f"Error downloading video: {str(e)}")
         raise
@@ -0,0 +1,142 @@
+"""
+Test Suite for Command Line Interface Module
+
+This module tests the lightweight CLI front end by:
+1. Verifying that importing the entry points loads no heavy dependencies
+2. Verifying that the transcript stage never loads OpenCV or Tesseract
+3. Checking subcommand argument parsing
+4. Rejecting unsupported OCR options before any work starts
+5. Using the configured transcript languages unless --lang is given
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+import src.config as config
+import src.transcript_processing as transcript_processing
+import src.video_metadata as video_metadata
+from src.cli import build_parser, cli
+from src.main import main
+
+HEAVY_MODULES = ["yt_dlp", "ffmpeg", "cv2", "pytesseract", "groq", "webvtt", "dotenv"]
+
+def imported_modules(statement):
+    """
+    Run an import statement in a fresh interpreter and list the heavy
+    modules it loaded.
+
+    Args:
+        statement (str): Python statement to execute
+
+    Returns:
+        list: Names from HEAVY_MODULES present in sys.modules afterwards
+    """
+    code = (
+        f"import sys\n{statement}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return [name for name in result.stdout.strip().split(",") if name]
+
+def test_entry_points_import_lazily():
+    """
+    Test that the CLI, main module and config load no heavy dependencies.
+    """
+    loaded = imported_modules("import src.cli, src.main, src.config")
+    assert loaded == [], f"Unexpected heavy imports: {loaded}"
+    print("✓ Entry points import no heavy dependencies")
+
+def test_transcript_stage_skips_ocr_dependencies():
+    """
+    Test that the transcript stage does not pull in OpenCV or Tesseract.
+    """
+    loaded = imported_modules("import src.transcript_processing")
+    assert "cv2" not in loaded and "pytesseract" not in loaded, \
+        f"Transcript stage imported OCR dependencies: {loaded}"
+    print("✓ Transcript stage skips OCR dependencies")
+
+def test_subcommand_parsing():
+    """
+    Test that each stage is exposed as a subcommand.
+    """
+    parser = build_parser()
+
+    args = parser.parse_args(["transcript", "https://example.com/v", "-o", "captions.json"])
+    assert args.command == "transcript"
+    assert args.url == "https://example.com/v"
+    assert args.output == "captions.json"
+    assert args.lang is None, "The configured TRANSCRIPT_LANGUAGES should apply"
+
+    args = parser.parse_args(["transcript", "--lang", "es, en", "--all-kinds"])
+    assert args.lang == ["es", "en"] and args.all_kinds
+
+    args = parser.parse_args(["ocr", "frames"])
+    assert args.command == "ocr" and args.frames_dir == "frames"
+    assert args.preprocessing == "auto" and args.timeout is None
+
+    args = parser.parse_args(["ocr", "frames", "--broker", "queue.db", "--timeout", "600"])
+    assert args.broker == "queue.db" and args.timeout == 600.0
+
+    args = parser.parse_args(["analyze", "--frames", "frames.json"])
+    assert args.command == "analyze" and args.captions is None
+    print("✓ Subcommands parsed")
+
+def test_unsupported_ocr_options_fail_early():
+    """
+    Test that confidence-aware OCR combined with a broker is rejected before
+    the video is resolved or any frame is published.
+    """
+    with pytest.raises(SystemExit) as exc_info:
+        cli(["ocr", "missing-frames", "--broker", "queue.db", "--min-confidence", "50"])
+    assert "--min-confidence" in str(exc_info.value)
+
+    def resolve_video_info(*args, **kwargs):
+        raise AssertionError("The video should not be resolved")
+
+    original = (config.OCR_BROKER, config.OCR_MIN_CONFIDENCE, video_metadata.resolve_video_info)
+    config.OCR_BROKER, config.OCR_MIN_CONFIDENCE = "queue.db", 50.0
+    video_metadata.resolve_video_info = resolve_video_info
+    try:
+        for bounded_memory in (False, True):
+            with pytest.raises(ValueError):
+                main("https://example.com/v", bounded_memory=bounded_memory)
+    finally:
+        config.OCR_BROKER, config.OCR_MIN_CONFIDENCE, video_metadata.resolve_video_info = original
+    print("✓ Unsupported OCR options rejected early")
+
+def test_transcript_languages_default_to_config():
+    """
+    Test that the transcript command fetches TRANSCRIPT_LANGUAGES like the
+    full pipeline does, unless --lang overrides them.
+    """
+    requested = []
+    def process_transcripts(video_url, languages, all_kinds=False):
+        requested.append(languages)
+        return {(languages[0], 'manual'): []}
+
+    output_path = "test_cli_captions.json"
+    original = (config.TRANSCRIPT_LANGUAGES, transcript_processing.process_transcripts)
+    config.TRANSCRIPT_LANGUAGES = ['es', 'en']
+    transcript_processing.process_transcripts = process_transcripts
+    try:
+        cli(["transcript", "https://example.com/v", "-o", output_path])
+        cli(["transcript", "https://example.com/v", "--lang", "fr", "-o", output_path])
+        assert requested == [['es', 'en'], ['fr']]
+        with open(output_path, encoding='utf-8') as f:
+            assert json.load(f) == {"fr.manual": []}
+        print("✓ Transcript languages default to the configuration")
+    finally:
+        config.TRANSCRIPT_LANGUAGES, transcript_processing.process_transcripts = original
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+if __name__ == "__main__":
+    test_entry_points_import_lazily()
+    test_transcript_stage_skips_ocr_dependencies()
+    test_subcommand_parsing()
+    test_unsupported_ocr_options_fail_early()
+    test_transcript_languages_default_to_config()
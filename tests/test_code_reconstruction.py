@@ -0,0 +1,198 @@
+"""
+Test Suite for Code Reconstruction Module
+
+This module tests the reconstruction of code listings from per-frame OCR text by:
+1. Collapsing identical frames into a single block
+2. Merging scrolled views of the same file
+3. Tolerating character-level OCR noise, including while scrolling
+4. Tracking the frame ranges of each block
+5. Bounding the number of open blocks when streaming
+6. Matching frames against a bounded number of candidate blocks
+"""
+
+import hashlib
+import src.code_reconstruction as code_reconstruction
+from src.code_reconstruction import reconstruct_code_blocks, iter_code_blocks, is_same_screen
+
+LISTING = [
+    "def load(path):",
+    "    with open(path) as f:",
+    "        return f.read()",
+    "",
+    "def save(path, data):",
+    "    with open(path, 'w') as f:",
+    "        f.write(data)",
+]
+
+def make_frame(index, lines):
+    """
+    Build a frame dictionary in the format returned by process_frames.
+
+    Args:
+        index (int): Frame number
+        lines (list): Lines of text visible in the frame
+
+    Returns:
+        dict: Frame dictionary with 'frame' and 'text' keys
+    """
+    return {'frame': f"frame_{index:04d}.png", 'text': "\n".join(lines)}
+
+def test_identical_frames_are_deduplicated():
+    """
+    Test that repeated frames produce a single block spanning all of them.
+    """
+    frames = [make_frame(i, LISTING[:3]) for i in range(1, 51)]
+    blocks = reconstruct_code_blocks(frames)
+
+    assert len(blocks) == 1, "Identical frames should collapse into one block"
+    assert blocks[0]['start_frame'] == "frame_0001.png"
+    assert blocks[0]['end_frame'] == "frame_0050.png"
+    assert len(blocks[0]['frames']) == 50
+    assert blocks[0]['text'] == "\n".join(LISTING[:3])
+    print("✓ Identical frames deduplicated")
+
+def test_scrolling_views_are_merged():
+    """
+    Test that overlapping views of a scrolling file form one listing.
+    """
+    frames = [
+        make_frame(1, LISTING[0:4]),
+        make_frame(2, LISTING[1:5]),
+        make_frame(3, LISTING[2:7]),
+    ]
+    blocks = reconstruct_code_blocks(frames)
+
+    assert len(blocks) == 1, "Scrolled views should merge into one block"
+    expected = "\n".join(line for line in LISTING if line)
+    assert blocks[0]['text'] == expected, "Merged listing should be in order"
+    print("✓ Scrolling views merged")
+
+def test_ocr_noise_is_tolerated():
+    """
+    Test that character-level OCR errors do not duplicate lines or blocks.
+    """
+    noisy = [
+        "def 1oad(path):",
+        "    with open(path) as f;",
+        "        return f.reacl()",
+    ]
+    frames = [make_frame(1, LISTING[:3]), make_frame(2, noisy), make_frame(3, LISTING[:3])]
+    blocks = reconstruct_code_blocks(frames)
+
+    assert len(blocks) == 1, "Noisy frames should join the existing block"
+    assert blocks[0]['text'] == "\n".join(LISTING[:3]), \
+        "Noisy reads of the same line should keep the first version"
+    assert len(blocks[0]['frames']) == 3
+
+    assert is_same_screen("\n".join(LISTING[:3]), "\n".join(noisy))
+    assert not is_same_screen("\n".join(LISTING[0:3]), "\n".join(LISTING[1:4])), \
+        "A scrolled view is not the same screen"
+    print("✓ OCR noise tolerated")
+
+def test_noisy_scrolling_views_are_merged():
+    """
+    Test that scrolled views with noisy lines still form one listing.
+    """
+    frames = [
+        make_frame(1, LISTING[0:3]),
+        make_frame(2, ["    with open(path) as f:",
+                       "        return f.reacl()",
+                       "def save(path, data):"]),
+        make_frame(3, ["        return f.read()",
+                       "def sav3(path, data):",
+                       "    with open(path, 'w') as f:"]),
+        make_frame(4, ["def save(path, data):",
+                       "    with 0pen(path, 'w') as f;",
+                       "        f.write(data)"]),
+    ]
+    blocks = reconstruct_code_blocks(frames)
+
+    assert len(blocks) == 1, "Noisy scrolled views should not fork a new block"
+    text = blocks[0]['text']
+    assert text.count("with open(path) as f:") == 1
+    assert text.count("with open(path, 'w') as f:") == 1, \
+        "Similar but distinct lines should both be kept"
+    assert text.splitlines() == [line for line in LISTING if line]
+    print("✓ Noisy scrolling views merged")
+
+def test_distinct_listings_keep_frame_ranges():
+    """
+    Test that separate listings become separate blocks, including a return
+    to an earlier listing.
+    """
+    other = ["import os", "print(os.getcwd())", "print(os.listdir('.'))"]
+    frames = [
+        make_frame(1, LISTING[:3]),
+        make_frame(2, LISTING[:3]),
+        make_frame(3, other),
+        make_frame(4, LISTING[:3]),
+        make_frame(5, []),
+    ]
+    blocks = reconstruct_code_blocks(frames)
+
+    assert len(blocks) == 2, "Each distinct listing should form one block"
+    assert blocks[0]['frames'] == ["frame_0001.png", "frame_0002.png", "frame_0004.png"]
+    assert blocks[1]['frames'] == ["frame_0003.png"]
+    print("✓ Frame ranges tracked")
+
+def test_streaming_closes_old_blocks():
+    """
+    Test that streaming with a bounded number of open blocks yields the
+    least recently seen block as soon as the limit is exceeded.
+    """
+    listings = [[f"step_{n}()", f"check_{n}()"] for n in range(4)]
+
+    def frames():
+        for index, lines in enumerate(listings, start=1):
+            yield make_frame(index, lines)
+
+    blocks = iter_code_blocks(frames(), max_open_blocks=2)
+    first = next(blocks)
+    assert first['frames'] == ["frame_0001.png"], "Oldest block should close first"
+    remaining = list(blocks)
+    assert [b['start_frame'] for b in remaining] == [
+        "frame_0002.png", "frame_0003.png", "frame_0004.png"
+    ]
+    print("✓ Streaming bounds open blocks")
+
+def test_frames_match_few_candidate_blocks():
+    """
+    Test that a listing shown again after many other screens is still merged,
+    while each frame is only matched against a bounded number of blocks.
+    """
+    # Distinct listings sharing only a common last line
+    screens = [
+        [f"token = '{hashlib.sha256(str(k).encode()).hexdigest()[:24]}'",
+         f"check('{hashlib.md5(str(k).encode()).hexdigest()[:24]}')", "return None"]
+        for k in range(60)
+    ]
+    frames = [make_frame(k + 1, lines) for k, lines in enumerate(screens)]
+    frames.append(make_frame(61, LISTING))
+    frames.append(make_frame(62, screens[3]))
+
+    calls = []
+    original_match = code_reconstruction.CodeBlock.match
+    def counting_match(self, keys, norms):
+        calls.append(self)
+        return original_match(self, keys, norms)
+
+    code_reconstruction.CodeBlock.match = counting_match
+    try:
+        blocks = reconstruct_code_blocks(frames)
+    finally:
+        code_reconstruction.CodeBlock.match = original_match
+
+    assert len(blocks) == 61
+    assert blocks[3]['frames'] == ["frame_0004.png", "frame_0062.png"], \
+        "A listing shown again should be merged into its earlier block"
+    assert len(calls) <= len(frames) * (1 + code_reconstruction.MAX_CANDIDATE_BLOCKS)
+    print("✓ Frames matched against a bounded number of blocks")
+
+if __name__ == "__main__":
+    test_identical_frames_are_deduplicated()
+    test_scrolling_views_are_merged()
+    test_ocr_noise_is_tolerated()
+    test_noisy_scrolling_views_are_merged()
+    test_distinct_listings_keep_frame_ranges()
+    test_streaming_closes_old_blocks()
+    test_frames_match_few_candidate_blocks()
@@ -7,11 +7,13 @@ It tests the content processing and analysis capabilities by:
 2. Verifying transcript analysis
 3. Testing frame text analysis
 4. Handling common API errors
+5. Splitting and packing text into bounded analysis windows
 """
 
 import os
 import pytest
-from src.groq_integration import process_content, analyze_transcript, analyze_extracted_text
+from src.groq_integration import (process_content, analyze_transcript, analyze_extracted_text,
+                                  iter_text_windows)
 from src.config import GROQ_API_KEY
 
 # Sample test data
@@ -131,7 +133,35 @@ def test_error_handling():
         print(f"✗ Error handling test failed: {str(e)}")
         raise e
 
+def test_iter_text_windows():
+    """
+    Test that text pieces are packed into windows of bounded size.
+    """
+    print("\nTesting text windows...")
+    
+    # Small pieces are packed together, counting the separator
+    assert list(iter_text_windows(["ab", "cd", "ef"], 5)) == ["ab\ncd", "ef"]
+    assert list(iter_text_windows(["ab", "cd"], 5, separator=" ")) == ["ab cd"]
+    
+    # Oversized pieces are split, flushing the open window first
+    windows = list(iter_text_windows(["aaaaa", "bbb", "c" * 12, ""], 6))
+    assert windows == ["aaaaa", "bbb", "cccccc", "cccccc"]
+    assert all(0 < len(w) <= 6 for w in windows)
+    
+    # Empty input and empty pieces produce no windows
+    assert list(iter_text_windows([], 6)) == []
+    assert list(iter_text_windows(["", ""], 6)) == []
+    
+    # Generators are consumed lazily
+    pieces = iter(["x" * 4] * 3)
+    windows = iter_text_windows(pieces, 4)
+    assert next(windows) == "xxxx"
+    assert len(list(pieces)) == 1, "Later pieces should not be read ahead"
+    print("✓ Text windows split and packed")
+
 if __name__ == "__main__":
+    test_iter_text_windows()
+    
     # Verify API key is available
     if not GROQ_API_KEY:
         print("✗ GROQ_API_KEY not found in environment variables")
@@ -0,0 +1,113 @@
+"""
+Test Suite for Main Application Module
+
+This module tests the pipeline orchestration with every stage stubbed out by:
+1. Running the pipeline in normal and bounded-memory mode on the same stages
+2. Checking that both modes record every transcript track in the results
+   corpus and the search index
+3. Ensuring proper cleanup of test artifacts
+"""
+
+import os
+import shutil
+from types import SimpleNamespace
+import src.config as config
+import src.groq_integration as groq_integration
+import src.ocr_processing as ocr_processing
+import src.transcript_processing as transcript_processing
+import src.video_metadata as video_metadata
+import src.video_processing as video_processing
+from src.main import main
+from src.results import read_jsonl
+from src.search_index import SearchIndex
+
+TEST_DIR = "test_main"
+
+TRACKS = {
+    ('en', 'manual'): "Now we start the containers",
+    ('es', 'automatic'): "Ahora iniciamos los contenedores",
+}
+
+def completion(content):
+    """
+    Build a stand-in Groq chat completion.
+    """
+    return SimpleNamespace(
+        model="llama-3.1-8b-instant",
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+    )
+
+def download_transcripts(video_url, *args, **kwargs):
+    """
+    Stand-in for transcript_processing.download_transcripts writing one VTT
+    file per track.
+    """
+    paths = {}
+    for (lang, kind), text in TRACKS.items():
+        path = os.path.join(TEST_DIR, f"transcript.{lang}.{kind}.vtt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"WEBVTT\n\n00:00:01.000 --> 00:00:03.000\n{text}\n")
+        paths[(lang, kind)] = path
+    return paths
+
+def iter_frames(*args, **kwargs):
+    """
+    Stand-in for ocr_processing.iter_frames.
+    """
+    yield {'frame': "frame_0001.png", 'text': "$ docker compose up -d"}
+
+STUBS = [
+    (video_metadata, 'resolve_video_info', lambda url: {'id': "vid1", 'title': "Docker"}),
+    (video_processing, 'process_video', lambda url, info: ("video.mp4", "frames")),
+    (transcript_processing, 'download_transcripts', download_transcripts),
+    (ocr_processing, 'iter_frames', iter_frames),
+    (ocr_processing, 'tesseract_lang', lambda languages: 'eng'),
+    (groq_integration, 'analyze_transcript', lambda captions: completion("transcript")),
+    (groq_integration, 'analyze_extracted_text', lambda frames: completion("frames")),
+    (groq_integration, 'analyze_transcript_windows', lambda captions: [completion("transcript")]),
+    (groq_integration, 'analyze_extracted_text_windows', lambda frames: [completion("frames")]),
+]
+
+def test_both_modes_record_every_track():
+    """
+    Test that normal and bounded-memory runs record the same caption tracks.
+    """
+    settings = {
+        'TRANSCRIPT_LANGUAGES': ['en', 'es'], 'FRAME_RATE': 0.5, 'SPILL_DIR': TEST_DIR,
+        'OCR_BROKER': '', 'OCR_MIN_CONFIDENCE': None, 'OCR_PREPROCESSING': 'otsu',
+        'OCR_EMBED_IMAGES': False, 'OCR_TIMEOUT': None,
+    }
+    originals = [(module, name, getattr(module, name)) for module, name, _ in STUBS]
+    originals += [(config, name, getattr(config, name))
+                  for name in list(settings) + ['RESULTS_PATH', 'SEARCH_INDEX']]
+    try:
+        os.makedirs(TEST_DIR, exist_ok=True)
+        for module, name, value in STUBS:
+            setattr(module, name, value)
+        for name, value in settings.items():
+            setattr(config, name, value)
+
+        recorded = {}
+        for bounded_memory in (False, True):
+            mode = "bounded" if bounded_memory else "normal"
+            config.RESULTS_PATH = os.path.join(TEST_DIR, f"{mode}.jsonl")
+            config.SEARCH_INDEX = os.path.join(TEST_DIR, f"{mode}.db")
+            main("https://example.com/v", bounded_memory=bounded_memory)
+
+            result, = read_jsonl(config.RESULTS_PATH)
+            with SearchIndex(config.SEARCH_INDEX) as index:
+                refs = sorted(h['ref'] for h in index.search("contenedores", source="caption"))
+            recorded[mode] = ([(c.lang, c.kind, c.text) for c in result.captions], refs)
+
+        assert recorded['normal'] == recorded['bounded'], "Both modes should record the same tracks"
+        assert recorded['bounded'][0] == [(lang, kind, text) for (lang, kind), text in TRACKS.items()]
+        assert recorded['bounded'][1] == ["es.automatic"]
+        print("✓ Both modes recorded every transcript track")
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_both_modes_record_every_track()
@@ -7,12 +7,19 @@ It tests both image preprocessing and text extraction capabilities by:
 2. Verifying preprocessing operations
 3. Validating OCR text extraction accuracy
 4. Cleaning up test artifacts
+5. Matching the OCR language to the transcript languages
+6. Filtering low-confidence and text-free frames
+7. Calibrating the preprocessing pipeline per video
 """
 
 import os
 import cv2
+import shutil
 import numpy as np
-from src.ocr_processing import process_frames, preprocess_image
+import pytest
+from src.ocr_processing import (process_frames, preprocess_image, tesseract_lang, has_text_regions,
+                                calibrate_preprocessing, _sample_text_frames,
+                                PREPROCESSING_PIPELINES, TESSERACT_LANGUAGES)
 
 def create_test_image(text, output_path):
     """
@@ -160,5 +167,109 @@ def test_ocr_processing():
         # Clean up test artifacts
         cleanup_test_files(frames_dir, created_files)
 
+def test_tesseract_lang():
+    """
+    Test mapping of subtitle languages to Tesseract language strings.
+    """
+    everything = set(TESSERACT_LANGUAGES.values())
+    assert tesseract_lang([], everything) == 'eng'
+    assert tesseract_lang(['en'], everything) == 'eng'
+    assert tesseract_lang(['es', 'pt-BR'], everything) == 'spa+por+eng'
+    assert tesseract_lang(['zh-Hant', 'xx'], everything) == 'chi_tra+eng'
+    
+    # Models that are not installed are dropped instead of failing every frame
+    assert tesseract_lang(['es', 'en'], available={'eng'}) == 'eng'
+    assert tesseract_lang(['es', 'fr'], available={'eng', 'fra'}) == 'fra+eng'
+    print("✓ Tesseract languages matched")
+
+def test_confidence_aware_ocr():
+    """
+    Test that confidence-aware OCR returns word boxes and skips blank frames.
+    """
+    frames_dir, created_files, test_data = setup_test_frames()
+    blank_path = os.path.join(frames_dir, "frame_004.png")
+    cv2.imwrite(blank_path, np.ones((100, 400), dtype=np.uint8) * 255)
+    created_files.append(blank_path)
+    try:
+        print("\nTesting text region detection...")
+        assert has_text_regions(cv2.imread(created_files[0], cv2.IMREAD_GRAYSCALE))
+        assert not has_text_regions(cv2.imread(blank_path, cv2.IMREAD_GRAYSCALE))
+        print("✓ Text-free frame detected before OCR")
+        
+        if not shutil.which("tesseract"):
+            pytest.skip("Tesseract not installed")
+        print("\nTesting confidence-aware frame processing...")
+        results = process_frames(frames_dir, min_confidence=50)
+        frames = [r['frame'] for r in results]
+        assert frames == [filename for _, filename in test_data], \
+            "All text frames should be kept and the blank frame skipped"
+        for result in results:
+            assert result['confidence'] >= 50
+            assert result['words'], "Kept frames should include word boxes"
+            for word in result['words']:
+                assert word['conf'] >= 60
+                assert word['width'] > 0 and word['height'] > 0
+            print(f"✓ Frame {result['frame']}: {result['text']} ({result['confidence']})")
+    finally:
+        cleanup_test_files(frames_dir, created_files)
+
+def test_preprocessing_calibration():
+    """
+    Test the preprocessing pipelines and their per-video calibration.
+    """
+    frames_dir, created_files, test_data = setup_test_frames()
+    dark_path = os.path.join(frames_dir, "frame_004.png")
+    cv2.imwrite(dark_path, 255 - cv2.imread(created_files[0], cv2.IMREAD_GRAYSCALE))
+    created_files.append(dark_path)
+    try:
+        print("\nTesting preprocessing pipelines...")
+        for name in PREPROCESSING_PIPELINES:
+            img = preprocess_image(created_files[0], name)
+            assert set(np.unique(img)) <= {0, 255}, f"{name} should binarize the frame"
+        assert preprocess_image(created_files[0], 'upscaled').shape == (200, 800)
+        dark = preprocess_image(dark_path, 'dark_theme')
+        assert np.array_equal(dark, preprocess_image(created_files[0], 'dark_theme'))
+        assert dark.mean() > 127, "Dark-theme frames should become dark text on light"
+        print("✓ Pipelines produce binarized frames")
+        
+        print("\nTesting preprocessing calibration...")
+        blank_dir = os.path.join(frames_dir, "blank")
+        os.makedirs(blank_dir, exist_ok=True)
+        cv2.imwrite(os.path.join(blank_dir, "frame_001.png"),
+                    np.ones((100, 400), dtype=np.uint8) * 255)
+        assert calibrate_preprocessing(blank_dir) == ('otsu', {})
+        print("✓ Frames without text fall back to otsu")
+        
+        # A 30-frame video where only every third frame shows text
+        video_dir = os.path.join(frames_dir, "video")
+        os.makedirs(video_dir, exist_ok=True)
+        for index in range(30):
+            path = os.path.join(video_dir, f"frame_{index:03d}.png")
+            if index % 3 == 2:
+                create_test_image("Hello World", path)
+            else:
+                cv2.imwrite(path, np.ones((100, 400), dtype=np.uint8) * 255)
+        sampled = [name for name, _ in _sample_text_frames(video_dir, 6)]
+        assert sampled == [f"frame_{index:03d}.png" for index in (2, 5, 11, 17, 20, 26)], \
+            "Samples should cover the whole video, skipping frames without text"
+        print("✓ Calibration samples spread over the whole video")
+        
+        if shutil.which("tesseract"):
+            pipeline, scores = calibrate_preprocessing(frames_dir)
+            assert pipeline in PREPROCESSING_PIPELINES
+            assert set(scores) == set(PREPROCESSING_PIPELINES)
+            print(f"✓ Calibrated pipeline: {pipeline}")
+            for name, stats in scores.items():
+                print(f"  {name}: score {stats['score']:.1f}, {stats['seconds']:.3f}s per frame")
+        else:
+            print("  Tesseract not installed, skipping calibration run")
+    finally:
+        shutil.rmtree(os.path.join(frames_dir, "blank"), ignore_errors=True)
+        shutil.rmtree(os.path.join(frames_dir, "video"), ignore_errors=True)
+        cleanup_test_files(frames_dir, created_files)
+
 if __name__ == "__main__":
-    test_ocr_processing() 
\ No newline at end of file
+    test_ocr_processing()
+    test_tesseract_lang()
+    test_confidence_aware_ocr()
+    test_preprocessing_calibration() 
\ No newline at end of file
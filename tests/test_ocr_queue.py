@@ -0,0 +1,360 @@
+"""
+Test Suite for OCR Queue Module
+
+This module tests the distributed OCR job queue using the local SQLite broker by:
+1. Collecting results from several workers in frame order
+2. Retrying jobs that fail or whose worker stops responding
+3. Releasing abandoned jobs while the publisher waits without workers
+4. Dropping embedded images of finished jobs and purging old results
+5. De-duplicating frames that are published more than once
+6. Upgrading queue databases created by older versions
+7. Ensuring proper cleanup of test artifacts
+It also runs the Redis broker against an in-process fake Redis server when
+fakeredis is installed.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import pytest
+import src.ocr_queue as ocr_queue
+from src.ocr_queue import SQLiteBroker, RedisBroker, run_worker, iter_frames_distributed
+
+TEST_DIR = "test_ocr_queue"
+
+def setup_test_frames(count):
+    """
+    Create a frames directory whose "images" contain their own text.
+
+    Args:
+        count (int): Number of frames to create
+
+    Returns:
+        tuple: (frames_dir, broker_path)
+    """
+    frames_dir = os.path.join(TEST_DIR, "frames")
+    os.makedirs(frames_dir, exist_ok=True)
+    for index in range(1, count + 1):
+        with open(os.path.join(frames_dir, f"frame_{index:04d}.png"), "w") as f:
+            f.write(f"text of frame {index}" if index % 5 else "")
+    return frames_dir, os.path.join(TEST_DIR, "queue.db")
+
+def read_text(frame_path, lang='eng', preprocessing='otsu'):
+    """
+    Stand-in OCR function returning the text stored in the test frame.
+    """
+    with open(frame_path) as f:
+        return f.read()
+
+def test_workers_return_results_in_order():
+    """
+    Test that frames processed by several workers are collected in order.
+    """
+    try:
+        frames_dir, broker_path = setup_test_frames(20)
+        workers = []
+        for n in range(3):
+            def work(worker_id=f"worker-{n}"):
+                with SQLiteBroker(broker_path) as broker:
+                    run_worker(broker, worker_id=worker_id, ocr_func=read_text,
+                               idle_timeout=1, poll_interval=0.05)
+            workers.append(threading.Thread(target=work))
+
+        with SQLiteBroker(broker_path) as broker:
+            results = iter_frames_distributed(frames_dir, broker, timeout=30)
+            for worker in workers:
+                worker.start()
+            results = list(results)
+
+        for worker in workers:
+            worker.join()
+
+        expected = [f"frame_{i:04d}.png" for i in range(1, 21) if i % 5]
+        assert [r['frame'] for r in results] == expected, "Results should be in frame order"
+        assert results[0]['text'] == "text of frame 1"
+        print(f"✓ Collected {len(results)} results in order")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_failed_and_abandoned_jobs_are_retried():
+    """
+    Test that failing jobs are retried and expired leases are reassigned.
+    """
+    try:
+        frames_dir, broker_path = setup_test_frames(2)
+        with SQLiteBroker(broker_path, lease_seconds=0, max_attempts=3) as broker:
+            job_ids = broker.publish(
+                (name, os.path.join(frames_dir, name), None)
+                for name in sorted(os.listdir(frames_dir))
+            )
+
+            # A worker claims the first job and disappears
+            abandoned = broker.claim("dead-worker")
+            assert abandoned['job_id'] == job_ids[0]
+
+            # The first real attempt at each job fails once
+            attempts = {}
+            def flaky_ocr(frame_path, lang, preprocessing):
+                attempts[frame_path] = attempts.get(frame_path, 0) + 1
+                if attempts[frame_path] == 1:
+                    raise RuntimeError("tesseract crashed")
+                return read_text(frame_path)
+
+            broker.lease_seconds = 60
+            run_worker(broker, worker_id="live-worker", ocr_func=flaky_ocr,
+                       idle_timeout=0, poll_interval=0.01)
+
+            rows = list(broker.iter_results(job_ids, timeout=1))
+            assert [row['status'] for row in rows] == ['done', 'done']
+            assert rows[0]['text'] == "text of frame 1"
+
+            # A late result from the abandoned worker is ignored
+            assert not broker.complete(job_ids[0], "dead-worker", "stale")
+            print("✓ Failed and abandoned jobs retried")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_abandoned_jobs_are_released_while_waiting():
+    """
+    Test that the publisher requeues or fails a job whose only worker died,
+    instead of waiting for it forever.
+    """
+    try:
+        frames_dir, broker_path = setup_test_frames(1)
+        frames = [(name, os.path.join(frames_dir, name), None)
+                  for name in sorted(os.listdir(frames_dir))]
+        with SQLiteBroker(broker_path, lease_seconds=0, max_attempts=2) as broker:
+            job_ids = broker.publish(frames)
+            assert broker.claim("dead-worker")['job_id'] == job_ids[0]
+            time.sleep(0.01)
+
+            # Attempts remain: the job goes back to the queue for a new worker
+            with pytest.raises(TimeoutError):
+                list(broker.iter_results(job_ids, timeout=0.2, poll_interval=0.01))
+            assert broker.result(job_ids[0])['status'] == 'pending'
+
+            # Last attempt abandoned: the job fails and the publisher moves on
+            assert broker.claim("dead-worker")['job_id'] == job_ids[0]
+            time.sleep(0.01)
+            rows = list(broker.iter_results(job_ids, timeout=2, poll_interval=0.01))
+            assert [(row['status'], row['error']) for row in rows] == [('failed', 'lease expired')]
+            print("✓ Abandoned jobs released while waiting")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_repeated_jobs_are_deduplicated():
+    """
+    Test that publishing the same frames again reuses finished jobs.
+    """
+    try:
+        frames_dir, broker_path = setup_test_frames(3)
+        calls = []
+        def counting_ocr(frame_path, lang, preprocessing):
+            calls.append(frame_path)
+            return read_text(frame_path)
+
+        with SQLiteBroker(broker_path) as broker:
+            frames = [
+                (name, os.path.join(frames_dir, name), None)
+                for name in sorted(os.listdir(frames_dir))
+            ]
+            first = broker.publish(frames)
+            run_worker(broker, ocr_func=counting_ocr, idle_timeout=0, poll_interval=0.01)
+
+            second = broker.publish(frames)
+            assert second == first, "Repeated frames should map to the same jobs"
+            assert broker.claim("worker") is None, "No job should be queued again"
+            assert len(calls) == 3
+
+            third = broker.publish(frames, preprocessing='adaptive')
+            assert not set(third) & set(first), "Other preprocessing should need new jobs"
+            print("✓ Repeated jobs de-duplicated")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_finished_jobs_drop_images_and_expire():
+    """
+    Test that embedded images are dropped once a job is done and that
+    finished jobs are purged after the result TTL.
+    """
+    try:
+        frames_dir, broker_path = setup_test_frames(2)
+        frames = []
+        for name in sorted(os.listdir(frames_dir)):
+            with open(os.path.join(frames_dir, name), "rb") as f:
+                frames.append((name, None, f.read()))
+
+        with SQLiteBroker(broker_path) as broker:
+            job_ids = broker.publish(frames)
+            run_worker(broker, ocr_func=read_text, idle_timeout=0, poll_interval=0.01)
+            assert [row['text'] for row in broker.iter_results(job_ids)] == [
+                "text of frame 1", "text of frame 2"
+            ]
+            images = broker._conn.execute("SELECT image FROM jobs").fetchall()
+            assert [row['image'] for row in images] == [None, None], "Images should be dropped"
+
+            assert broker.purge() == 0, "Recent results should be kept"
+            broker.result_ttl = 0
+            time.sleep(0.01)
+            assert broker.purge() == 2
+            assert broker.result(job_ids[0]) is None
+            print("✓ Finished jobs drop images and expire")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_older_queue_databases_are_migrated():
+    """
+    Test that a queue database created before the lang and preprocessing
+    columns existed is upgraded when opened.
+    """
+    try:
+        frames_dir, broker_path = setup_test_frames(2)
+        conn = sqlite3.connect(broker_path)
+        conn.executescript("""
+            CREATE TABLE jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT UNIQUE NOT NULL,
+                frame TEXT NOT NULL, frame_path TEXT, image BLOB,
+                status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT, lease_expires REAL, text TEXT, error TEXT
+            );
+            INSERT INTO jobs (job_id, frame, status, text) VALUES ('old', 'frame_0000.png', 'done', 'x');
+        """)
+        conn.close()
+
+        with SQLiteBroker(broker_path) as broker:
+            job_ids = broker.publish(
+                (name, os.path.join(frames_dir, name), None)
+                for name in sorted(os.listdir(frames_dir))
+            )
+            run_worker(broker, ocr_func=read_text, idle_timeout=0, poll_interval=0.01)
+            assert [row['text'] for row in broker.iter_results(job_ids)] == [
+                "text of frame 1", "text of frame 2"
+            ]
+            assert broker.result('old')['text'] == 'x', "Existing jobs should be kept"
+        with SQLiteBroker(broker_path) as broker:
+            assert broker.claim("worker") is None
+        print("✓ Older queue database migrated")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_publishing_in_batches_lets_workers_claim():
+    """
+    Test that publishing commits jobs batch by batch instead of holding the
+    queue locked until every frame has been hashed.
+    """
+    batch_size = ocr_queue.PUBLISH_BATCH
+    try:
+        frames_dir, broker_path = setup_test_frames(10)
+        ocr_queue.PUBLISH_BATCH = 3
+        with SQLiteBroker(broker_path) as publisher, SQLiteBroker(broker_path) as worker:
+            claimed = []
+            def frames():
+                for index, name in enumerate(sorted(os.listdir(frames_dir))):
+                    if index == 5:
+                        # The first batch is committed and claimable by now
+                        claimed.append(worker.claim("worker"))
+                    yield name, os.path.join(frames_dir, name), None
+
+            job_ids = publisher.publish(frames())
+            assert len(job_ids) == 10
+            assert claimed[0] is not None and claimed[0]['job_id'] == job_ids[0]
+            print("✓ Jobs claimable while publishing continues")
+    finally:
+        ocr_queue.PUBLISH_BATCH = batch_size
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_redis_broker():
+    """
+    Test the Redis broker: ordered results, embedded images, retries,
+    expired leases and de-duplication.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+
+    def open_broker(**kwargs):
+        return RedisBroker("redis://fake", client=fakeredis.FakeRedis(server=server), **kwargs)
+
+    try:
+        frames_dir, _ = setup_test_frames(12)
+        workers = []
+        for n in range(2):
+            def work(worker_id=f"worker-{n}"):
+                with open_broker() as broker:
+                    run_worker(broker, worker_id=worker_id, ocr_func=read_text,
+                               idle_timeout=1, poll_interval=0.05)
+            workers.append(threading.Thread(target=work))
+
+        with open_broker() as broker:
+            results = iter_frames_distributed(frames_dir, broker, embed_images=True, timeout=30)
+            for worker in workers:
+                worker.start()
+            results = list(results)
+        for worker in workers:
+            worker.join()
+
+        client = fakeredis.FakeRedis(server=server)
+        job_keys = client.keys("ocr:job:*")
+        assert len(job_keys) == 12
+        assert not any(client.hexists(key, "image") for key in job_keys), \
+            "Images should be dropped from finished jobs"
+        assert all(0 < client.ttl(key) <= ocr_queue.RESULT_TTL for key in job_keys), \
+            "Finished jobs should expire"
+
+        expected = [f"frame_{i:04d}.png" for i in range(1, 13) if i % 5]
+        assert [r['frame'] for r in results] == expected, "Results should be in frame order"
+        assert results[0]['text'] == "text of frame 1"
+        print("✓ Redis broker collected embedded-image results in order")
+
+        with open_broker(lease_seconds=0, max_attempts=2) as broker:
+            frames = [(name, os.path.join(frames_dir, name), None)
+                      for name in sorted(os.listdir(frames_dir))[:2]]
+            job_ids = broker.publish(frames, preprocessing='adaptive')
+            assert broker.publish(frames, preprocessing='adaptive') == job_ids
+            assert broker.claim("dead-worker")['job_id'] == job_ids[0]
+            time.sleep(0.01)
+
+            broker.lease_seconds = 60
+            job = broker.claim("live-worker")
+            assert job['job_id'] == job_ids[0], "Expired job should be claimed again"
+            assert job['preprocessing'] == 'adaptive' and job['image'] is None
+            assert not broker.complete(job_ids[0], "dead-worker", "stale")
+            broker.fail(job_ids[0], "live-worker", "tesseract crashed")
+            assert broker.result(job_ids[0])['status'] == 'failed', "Attempts should run out"
+
+            run_worker(broker, worker_id="live-worker", ocr_func=read_text,
+                       idle_timeout=0, poll_interval=0.01)
+            rows = list(broker.iter_results(job_ids, timeout=1))
+            assert [row['status'] for row in rows] == ['failed', 'done']
+            assert rows[0]['error'] == "tesseract crashed"
+
+            # Failed jobs get a fresh set of attempts when published again
+            broker.publish(frames, preprocessing='adaptive')
+            assert client.ttl(f"ocr:job:{job_ids[0]}") == -1, "Requeued jobs should not expire"
+            run_worker(broker, ocr_func=read_text, idle_timeout=0, poll_interval=0.01)
+            assert broker.result(job_ids[0])['text'] == "text of frame 1"
+            print("✓ Redis broker retried, reassigned and de-duplicated jobs")
+
+        with open_broker(lease_seconds=0, max_attempts=1) as broker:
+            job_ids = broker.publish(frames, preprocessing='upscaled')
+            assert broker.claim("dead-worker")['job_id'] == job_ids[0]
+            assert broker.claim("dead-worker")['job_id'] == job_ids[1]
+            time.sleep(0.01)
+            rows = list(broker.iter_results(job_ids, timeout=2, poll_interval=0.01))
+            assert [row['status'] for row in rows] == ['failed', 'failed']
+            assert rows[0]['error'] == 'lease expired'
+            print("✓ Redis broker released abandoned jobs while waiting")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_workers_return_results_in_order()
+    test_failed_and_abandoned_jobs_are_retried()
+    test_abandoned_jobs_are_released_while_waiting()
+    test_repeated_jobs_are_deduplicated()
+    test_finished_jobs_drop_images_and_expire()
+    test_older_queue_databases_are_migrated()
+    test_publishing_in_batches_lets_workers_claim()
+    test_redis_broker()
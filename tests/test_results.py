@@ -0,0 +1,130 @@
+"""
+Test Suite for Results Module
+
+This module tests the typed result schema and its serialization by:
+1. Converting pipeline output to typed records with numeric times
+2. Round-tripping a corpus of results through JSONL, at once or one video at a time
+3. Streaming the result tables to Parquet with fixed schemas when pyarrow is available
+4. Ensuring proper cleanup of test artifacts
+"""
+
+import os
+import shutil
+from types import SimpleNamespace
+import pytest
+from src import results
+from src.results import (VideoRecord, VideoResult, FrameRecord, frame_records, caption_records,
+                         analysis_record, parse_timestamp, frame_time, write_jsonl, read_jsonl,
+                         iter_video_results, export_parquet)
+
+TEST_DIR = "test_results"
+
+SAMPLE_FRAME_TEXTS = [
+    {"frame": "frame_0001.png", "text": "def hello_world():"},
+    {"frame": "frame_0031.png", "text": "    print('Hello, World!')", "confidence": 91.5},
+]
+
+SAMPLE_CAPTIONS = [
+    {"start": "00:00:00.000", "end": "00:00:02.500", "text": "Hello, today we'll learn Python"},
+    {"start": "01:02:03.250", "end": "01:02:05.000", "text": "Let's start with a simple example"},
+]
+
+def make_result(video_id):
+    """
+    Build a VideoResult from sample pipeline output.
+
+    Args:
+        video_id (str): Id of the sample video
+
+    Returns:
+        VideoResult: Result with frames, captions and one analysis
+    """
+    completion = SimpleNamespace(
+        model="llama-3.1-8b-instant",
+        choices=[SimpleNamespace(message=SimpleNamespace(content="Main topics: Python"))],
+        usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+    )
+    return VideoResult(
+        VideoRecord(video_id, f"https://www.youtube.com/watch?v={video_id}", "Python Basics"),
+        frames=list(frame_records(video_id, SAMPLE_FRAME_TEXTS, 0.5)),
+        captions=list(caption_records(video_id, SAMPLE_CAPTIONS, "en", "manual")),
+        analyses=[analysis_record(video_id, "transcript", completion)]
+    )
+
+def test_record_conversion():
+    """
+    Test conversion of pipeline output to typed records.
+    """
+    assert parse_timestamp("00:00:02.500") == 2.5
+    assert parse_timestamp("01:02:03.250") == 3723.25
+    assert parse_timestamp("02:03.000") == 123.0
+    assert frame_time("frame_0031.png", 0.5) == 60.0
+    assert frame_time("cover.png", 0.5) is None
+
+    result = make_result("abc123")
+    assert result.frames[1] == FrameRecord("abc123", "frame_0031.png", 60.0,
+                                           "    print('Hello, World!')", 91.5)
+    assert result.frames[0].confidence is None
+    assert result.captions[1].start == 3723.25
+    assert result.analyses[0].prompt_tokens == 120
+    assert result.analysis("transcript") == "Main topics: Python"
+    assert not hasattr(result.frames[0], "__dict__"), "Records should use __slots__"
+    print("✓ Pipeline output converted to typed records")
+
+def test_jsonl_round_trip():
+    """
+    Test that a corpus of results survives a JSONL round trip.
+    """
+    try:
+        path = os.path.join(TEST_DIR, "results.jsonl")
+        first, second = make_result("abc123"), make_result("def456")
+        assert write_jsonl([first], path, append=False) == 6
+        write_jsonl([second], path)
+
+        loaded = read_jsonl(path)
+        assert [r.video.video_id for r in loaded] == ["abc123", "def456"]
+        for original, restored in zip([first, second], loaded):
+            assert list(restored.records()) == list(original.records())
+
+        streamed = iter_video_results(path)
+        restored = next(streamed)
+        assert list(restored.records()) == list(first.records())
+        assert list(next(streamed).records()) == list(second.records())
+        assert next(streamed, None) is None
+        print("✓ Results round-tripped through JSONL")
+    finally:
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+def test_parquet_export():
+    """
+    Test export of the result tables to Parquet.
+    """
+    pq = pytest.importorskip("pyarrow.parquet")
+    batch_rows = results.PARQUET_BATCH_ROWS
+    try:
+        results.PARQUET_BATCH_ROWS = 3
+        paths = export_parquet([make_result("abc123"), make_result("def456")], TEST_DIR)
+        assert set(paths) == {"videos", "frames", "captions", "analyses"}
+        frames = pq.read_table(paths["frames"])
+        assert frames.num_rows == 4
+        assert frames.column("time").to_pylist() == [0.0, 60.0, 0.0, 60.0]
+        assert pq.ParquetFile(paths["frames"]).num_row_groups == 2, "Rows should be streamed"
+        print("✓ Results exported to Parquet")
+
+        # Schemas are fixed, even when a column is empty in this export
+        result = make_result("ghi789")
+        result.frames[1].confidence = None
+        result.analyses = []
+        paths = export_parquet(result.records(), TEST_DIR)
+        assert str(pq.read_schema(paths["frames"]).field("confidence").type) == "double"
+        assert pq.read_table(paths["analyses"]).num_rows == 0
+        assert str(pq.read_schema(paths["analyses"]).field("prompt_tokens").type) == "int64"
+        print("✓ Parquet schemas fixed per record type")
+    finally:
+        results.PARQUET_BATCH_ROWS = batch_rows
+        shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_record_conversion()
+    test_jsonl_round_trip()
+    test_parquet_export()
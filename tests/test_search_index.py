@@ -0,0 +1,141 @@
+"""
+Test Suite for Search Index Module
+
+This module tests the full-text index over processed videos by:
+1. Ingesting OCR text and captions with their time offsets
+2. Finding phrases and returning the video and offset where they appeared
+3. Re-ingesting a video incrementally without duplicating entries
+4. Collapsing OCR-noisy repeats of the same screen
+5. Rejecting malformed query expressions
+6. Indexing a JSONL results corpus from the command line
+7. Ensuring proper cleanup of the index database
+"""
+
+import os
+import pytest
+from src.cli import cli
+from src.results import VideoRecord, VideoResult, frame_records, write_jsonl
+from src.search_index import SearchIndex
+
+INDEX_PATH = "test_search_index.db"
+
+SAMPLE_FRAME_TEXTS = [
+    {"frame": "frame_0001.png", "text": "$ docker compose up -d"},
+    {"frame": "frame_0002.png", "text": "$ docker compose up -d"},
+    {"frame": "frame_0003.png", "text": "$ docker compose up -d"},
+    {"frame": "frame_0004.png", "text": "def main():\n    print('hello')"},
+]
+
+SAMPLE_CAPTIONS = [
+    {"start": "00:00:00.000", "end": "00:00:03.000", "text": "First we start the containers"},
+    {"start": "00:01:10.500", "end": "00:01:13.000", "text": "Now run docker compose up again"},
+]
+
+def test_phrase_search():
+    """
+    Test that phrases are found with their video and time offset.
+    """
+    try:
+        with SearchIndex(INDEX_PATH) as index:
+            segments = index.ingest_video("vid1", SAMPLE_FRAME_TEXTS, SAMPLE_CAPTIONS,
+                                          frame_rate=0.5, title="Docker Basics")
+            index.ingest_video("vid2", [{"frame": "frame_0010.png", "text": "docker ps"}])
+            assert segments == 4, "Repeated frames should be stored once"
+
+            hits = index.search("docker compose up", source="frame")
+            assert len(hits) == 1
+            assert hits[0]['video_id'] == "vid1" and hits[0]['title'] == "Docker Basics"
+            assert (hits[0]['start'], hits[0]['end']) == (0.0, 4.0)
+            assert hits[0]['snippet'] == "$ [docker compose up] -d"
+
+            hits = index.search("docker compose up", source="caption")
+            assert [(h['video_id'], h['start'], h['ref']) for h in hits] == [("vid1", 70.5, "en.manual")]
+
+            assert {h['video_id'] for h in index.search("docker")} == {"vid1", "vid2"}
+            assert index.search("compose docker") == [], "Phrase order should matter"
+            assert len(index.search("compose AND docker", phrase=False)) == 2
+            print("✓ Phrase search returned videos and offsets")
+    finally:
+        if os.path.exists(INDEX_PATH):
+            os.remove(INDEX_PATH)
+
+def test_incremental_ingestion():
+    """
+    Test that re-ingesting a video replaces its previous entries.
+    """
+    try:
+        with SearchIndex(INDEX_PATH) as index:
+            index.ingest_video("vid1", SAMPLE_FRAME_TEXTS)
+            index.ingest_video("vid1", [{"frame": "frame_0005.png", "text": "kubectl apply"}])
+            assert index.search("docker compose up") == []
+            assert index.search("kubectl apply")[0]['start'] == 8.0
+
+            index.ingest_video("vid2", SAMPLE_FRAME_TEXTS)
+            assert index.video_ids() == ["vid1", "vid2"]
+            index.remove_video("vid2")
+            assert index.video_ids() == ["vid1"]
+            assert index.search("docker compose up") == []
+            print("✓ Videos re-ingested incrementally")
+    finally:
+        if os.path.exists(INDEX_PATH):
+            os.remove(INDEX_PATH)
+
+def test_noisy_repeats_and_invalid_expressions():
+    """
+    Test that noisy reads of one screen form one segment and that malformed
+    expressions are reported instead of crashing.
+    """
+    listing = "def load(path):\n    with open(path) as f:\n        return f.read()"
+    noisy = "def 1oad(path):\n    with open(path) as f;\n        return f.reacl()"
+    frames = [
+        {"frame": "frame_0001.png", "text": listing},
+        {"frame": "frame_0002.png", "text": noisy},
+        {"frame": "frame_0003.png", "text": listing},
+        {"frame": "frame_0004.png", "text": "def save(path, data):\n    f.write(data)"},
+    ]
+    try:
+        with SearchIndex(INDEX_PATH) as index:
+            assert index.ingest_video("vid1", frames) == 2
+            hits = index.search("return f.read()")
+            assert [(h['start'], h['end']) for h in hits] == [(0.0, 4.0)]
+            print("✓ Noisy repeats stored as one segment")
+
+            with pytest.raises(ValueError):
+                index.search("os.path(", phrase=False)
+        with pytest.raises(SystemExit) as exc_info:
+            cli(["search", INDEX_PATH, "os.path(", "--expression"])
+        assert "Invalid search expression" in str(exc_info.value)
+        print("✓ Malformed expression reported")
+    finally:
+        if os.path.exists(INDEX_PATH):
+            os.remove(INDEX_PATH)
+
+def test_index_command():
+    """
+    Test that the index command adds every video of a results corpus.
+    """
+    results_path = "test_search_index.jsonl"
+    try:
+        for video_id in ("vid1", "vid2"):
+            write_jsonl([VideoResult(
+                VideoRecord(video_id, None, f"Video {video_id}"),
+                frames=list(frame_records(video_id, SAMPLE_FRAME_TEXTS, 0.5))
+            )], results_path)
+        cli(["index", INDEX_PATH, results_path])
+        with SearchIndex(INDEX_PATH) as index:
+            assert index.video_ids() == ["vid1", "vid2"]
+            hits = index.search("docker compose up")
+            assert sorted((h['video_id'], h['start'], h['end']) for h in hits) == [
+                ("vid1", 0.0, 4.0), ("vid2", 0.0, 4.0)
+            ]
+        print("✓ Results corpus indexed")
+    finally:
+        for path in (INDEX_PATH, results_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+if __name__ == "__main__":
+    test_phrase_search()
+    test_incremental_ingestion()
+    test_noisy_repeats_and_invalid_expressions()
+    test_index_command()
@@ -7,9 +7,10 @@ It tests the YouTube subtitle extraction and parsing capabilities by:
 2. Verifying VTT file creation and content
 3. Validating caption parsing and structure
 4. Ensuring proper cleanup of temporary files
+5. Selecting subtitle tracks by language and kind
 """
 
-from src.transcript_processing import process_transcript
+from src.transcript_processing import process_transcript, list_subtitle_tracks, select_tracks
 from src.config import VIDEO_URL
 import os
 import glob
@@ -93,5 +94,34 @@ def test_process_transcript():
         print("\nCleaning up test artifacts...")
         cleanup_test_files()
 
+def test_select_tracks():
+    """
+    Test that subtitle tracks are listed and chosen deterministically.
+    """
+    info = {
+        'subtitles': {
+            'en': [{'ext': 'json3', 'url': 'https://example.com/en.json3'},
+                   {'ext': 'vtt', 'url': 'https://example.com/en.vtt'}],
+        },
+        'automatic_captions': {
+            'en': [{'ext': 'vtt', 'url': 'https://example.com/en-auto.vtt'}],
+            'es': [{'ext': 'vtt', 'url': 'https://example.com/es-auto.vtt'}],
+            'fr': [{'ext': 'srv3', 'url': 'https://example.com/fr-auto.srv3'}],
+        },
+    }
+    tracks = list_subtitle_tracks(info)
+    assert tracks == {
+        ('en', 'manual'): 'https://example.com/en.vtt',
+        ('en', 'automatic'): 'https://example.com/en-auto.vtt',
+        ('es', 'automatic'): 'https://example.com/es-auto.vtt',
+    }
+    
+    # Manual tracks are preferred, missing languages are skipped
+    assert select_tracks(tracks, ['es', 'fr', 'en']) == [('es', 'automatic'), ('en', 'manual')]
+    assert select_tracks(tracks, ['en'], kinds=('automatic', 'manual')) == [('en', 'automatic')]
+    assert select_tracks(tracks, ['en'], all_kinds=True) == [('en', 'manual'), ('en', 'automatic')]
+    print("✓ Subtitle tracks selected deterministically")
+
 if __name__ == "__main__":
-    test_process_transcript() 
\ No newline at end of file
+    test_process_transcript()
+    test_select_tracks() 
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Test Suite for Video Metadata Module
+
+This module tests the shared video metadata cache using a recorded info dict by:
+1. Serving metadata from the on-disk cache without running the extractor
+2. Serving repeated lookups from the in-memory cache
+3. Expiring cached metadata after its time to live
+4. Bounding the number of videos kept in memory
+5. Running the video and transcript stages on the recorded metadata
+6. Ensuring proper cleanup of cache files
+"""
+
+import glob
+import json
+import os
+import shutil
+import time
+from src import video_metadata, video_processing, transcript_processing
+from src.video_metadata import resolve_video_info, load_cached_info, save_cached_info, cache_path
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "video_info.json")
+CACHE_DIR = "test_video_info_cache"
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+def load_fixture():
+    """
+    Load the recorded yt-dlp info dict.
+
+    Returns:
+        dict: The recorded metadata
+    """
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+def test_resolve_from_disk_and_memory_cache():
+    """
+    Test that cached metadata is reused without running the extractor.
+    """
+    try:
+        fixture = load_fixture()
+        save_cached_info(VIDEO_URL, fixture, CACHE_DIR)
+        video_metadata._memory_cache.pop(VIDEO_URL, None)
+
+        info = resolve_video_info(VIDEO_URL, cache_dir=CACHE_DIR)
+        assert info == fixture, "Metadata should come from the disk cache"
+        assert set(info['subtitles']) == {'en'}
+        print("✓ Metadata served from disk cache")
+
+        # The in-memory cache answers even after the file is gone
+        os.remove(cache_path(VIDEO_URL, CACHE_DIR))
+        assert resolve_video_info(VIDEO_URL, cache_dir=CACHE_DIR) is info
+        print("✓ Metadata served from memory cache")
+    finally:
+        video_metadata._memory_cache.pop(VIDEO_URL, None)
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+def test_cached_metadata_expires():
+    """
+    Test that cached metadata older than the time to live is ignored.
+    """
+    try:
+        save_cached_info(VIDEO_URL, load_fixture(), CACHE_DIR)
+        assert load_cached_info(VIDEO_URL, CACHE_DIR, ttl=60) is not None
+
+        # Age the cache entry past its time to live
+        path = cache_path(VIDEO_URL, CACHE_DIR)
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
+        entry['fetched_at'] = time.time() - 120
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+
+        assert load_cached_info(VIDEO_URL, CACHE_DIR, ttl=60) is None
+        assert load_cached_info("https://example.com/other", CACHE_DIR) is None
+        print("✓ Expired and missing metadata ignored")
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+def test_memory_cache_is_bounded():
+    """
+    Test that only the most recently used videos stay in memory.
+    """
+    saved = dict(video_metadata._memory_cache)
+    try:
+        video_metadata._memory_cache.clear()
+        fixture = load_fixture()
+        urls = [f"{VIDEO_URL}&n={n}" for n in range(video_metadata.MEMORY_CACHE_SIZE + 2)]
+        for url in urls:
+            save_cached_info(url, fixture, CACHE_DIR)
+            resolve_video_info(url, cache_dir=CACHE_DIR)
+        resolve_video_info(urls[2], cache_dir=CACHE_DIR)
+
+        cached = list(video_metadata._memory_cache)
+        assert len(cached) == video_metadata.MEMORY_CACHE_SIZE
+        assert urls[0] not in cached and urls[1] not in cached
+        assert cached[-1] == urls[2], "Lookups should refresh an entry's position"
+        print("✓ Memory cache bounded")
+    finally:
+        video_metadata._memory_cache.clear()
+        video_metadata._memory_cache.update(saved)
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+class FakeYoutubeDL:
+    """
+    Stand-in for yt_dlp.YoutubeDL that records the info dicts it processes.
+    """
+    processed = []
+
+    def __init__(self, options):
+        self.options = options
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def process_ie_result(self, info, download=True):
+        self.processed.append(info)
+        open(self.options['outtmpl'], "w").close()
+        return info
+
+class FakeFfmpeg:
+    """
+    Stand-in for the ffmpeg module that accepts any pipeline and does nothing.
+    """
+    Error = Exception
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+def test_stages_use_recorded_metadata():
+    """
+    Test that the video and transcript stages run from the recorded metadata
+    without running the extractor again.
+    """
+    fetched = []
+    def fake_fetch_track(url, path):
+        fetched.append(url)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("WEBVTT\n\n00:00:00.000 --> 00:00:02.000\nOpening a file in Python\n")
+        return path
+
+    def no_extractor(video_url):
+        raise AssertionError("The extractor should not run for cached metadata")
+
+    originals = (video_metadata._extract_info, video_processing.yt_dlp,
+                 video_processing.ffmpeg, transcript_processing._fetch_track)
+    try:
+        save_cached_info(VIDEO_URL, load_fixture(), CACHE_DIR)
+        video_metadata._memory_cache.pop(VIDEO_URL, None)
+        info = resolve_video_info(VIDEO_URL, cache_dir=CACHE_DIR)
+
+        video_metadata._extract_info = no_extractor
+        video_processing.yt_dlp = type("FakeYtDlp", (), {"YoutubeDL": FakeYoutubeDL})
+        video_processing.ffmpeg = FakeFfmpeg()
+        transcript_processing._fetch_track = fake_fetch_track
+
+        video_path, frames_dir = video_processing.process_video(VIDEO_URL, info)
+        assert os.path.exists(video_path) and os.path.isdir(frames_dir)
+        assert FakeYoutubeDL.processed[-1] == info, "Formats should come from the cached info"
+        assert FakeYoutubeDL.processed[-1] is not info, "The shared info must not be mutated"
+
+        paths = transcript_processing.download_transcripts(VIDEO_URL, ["es", "en"],
+                                                           all_kinds=True, info=info)
+        assert list(paths) == [("es", "automatic"), ("en", "manual"), ("en", "automatic")]
+        assert fetched[1] == info['subtitles']['en'][1]['url'], "The VTT track should be used"
+        captions = list(transcript_processing.iter_captions(paths[("en", "manual")]))
+        assert captions[0]['text'] == "Opening a file in Python"
+        print("✓ Video and transcript stages used the recorded metadata")
+    finally:
+        (video_metadata._extract_info, video_processing.yt_dlp,
+         video_processing.ffmpeg, transcript_processing._fetch_track) = originals
+        video_metadata._memory_cache.pop(VIDEO_URL, None)
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        shutil.rmtree("frames", ignore_errors=True)
+        for path in ["downloaded_video.mp4"] + glob.glob("transcript.*.vtt"):
+            os.remove(path)
+
+if __name__ == "__main__":
+    test_resolve_from_disk_and_memory_cache()
+    test_cached_metadata_expires()
+    test_memory_cache_is_bounded()
+    test_stages_use_recorded_metadata()